@@ -1,17 +1,23 @@
 # app/citizen/ai_service.py - SIMPLE HACKATHON VERSION
 
 import os
-import json
 import base64
 import asyncio
+import logging
+import time
 from datetime import datetime
 from typing import Dict, List
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+import orjson
 from PIL import Image
 import io
 import cloudinary
 import cloudinary.uploader
 from groq import Groq
 
+logger = logging.getLogger(__name__)
+
 # Configure Cloudinary
 cloudinary.config(
     cloud_name="dsgnz3ekm",
@@ -22,59 +28,56 @@ cloudinary.config(
 class SimpleMithraAI:
     def __init__(self):
         self.groq_client = Groq(api_key="GROQ_API_KEY")
-        print("✅ MITRA AI Ready for Hackathon!")
+        logger.info("✅ MITRA AI Ready for Hackathon!")
 
     async def complete_analysis_pipeline(self, request_data: Dict, user_language: str = "en") -> Dict:
         """AI Pipeline: Image Analysis → Validation → Content Generation"""
         
         try:
-            print("\n" + "="*50)
-            print("🤖 MITRA AI: Processing waste management request")
-            print("="*50)
-            print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"📍 Location: {request_data.get('location', {}).get('address', 'Unknown')}")
-            print(f"📝 Description: {request_data.get('description', 'No description')[:50]}...")
+            logger.info("🤖 MITRA AI: Processing waste management request")
+            logger.debug("📍 Location: %s", request_data.get('location', {}).get('address', 'Unknown'))
+            logger.debug("📝 Description: %.50s...", request_data.get('description', 'No description'))
             
             # STEP 2: AI Image Analysis FIRST (before uploading)
-            print("\n🔍 Analyzing images with computer vision...")
+            logger.debug("🔍 Analyzing images with computer vision...")
             image_analysis = {}
             if request_data.get("images"):
                 image_analysis = await self._analyze_image_simple(request_data["images"][0])
                 waste_type = image_analysis.get('waste_type', 'unknown')
                 confidence = image_analysis.get('confidence', 0.0)
-                print(f"✅ Detected: {waste_type} (confidence: {confidence:.2f})")
-                print(f"📊 Analysis: {image_analysis.get('description', 'No description')[:80]}...")
+                logger.info("✅ Detected: %s (confidence: %.2f)", waste_type, confidence)
+                logger.debug("📊 Analysis: %.80s...", image_analysis.get('description', 'No description'))
             else:
-                print("❌ No images to analyze")
+                logger.debug("❌ No images to analyze")
             
             # STEP 1: Upload images to Cloudinary (after analysis)
-            print("\n📸 Uploading images to cloud storage...")
+            logger.debug("📸 Uploading images to cloud storage...")
             cloudinary_urls = []
             if request_data.get("images"):
                 cloudinary_urls = await self._upload_to_cloudinary(request_data["images"])
-                print(f"✅ {len(cloudinary_urls)} images uploaded successfully")
+                logger.info("✅ %s images uploaded successfully", len(cloudinary_urls))
             else:
-                print("⚠️  No images provided")
+                logger.debug("⚠️ No images provided")
             
             # STEP 3: Request Validation
-            print("\n🛡️  Validating request authenticity...")
+            logger.debug("🛡️ Validating request authenticity...")
             validation = await self._validate_request_simple(
                 user_description=request_data.get("description", ""),
                 ai_analysis=image_analysis
             )
             
             if not validation.get("is_valid", False):
-                print(f"❌ Validation failed: {validation.get('reason', 'Invalid request')}")
+                logger.warning("❌ Validation failed: %s", validation.get('reason', 'Invalid request'))
                 return {
                     "status": "rejected",
                     "message": validation.get("reason", "Request validation failed"),
                     "cloudinary_urls": cloudinary_urls
                 }
             
-            print(f"✅ Request validated (score: {validation.get('score', 0)}/10)")
+            logger.info("✅ Request validated (score: %s/10)", validation.get('score', 0))
             
             # STEP 4: Generate Enhanced Content
-            print("\n🎨 Generating enhanced content...")
+            logger.debug("🎨 Generating enhanced content...")
             beautiful_content = await self._beautify_content_simple(
                 user_description=request_data.get("description", ""),
                 ai_analysis=image_analysis,
@@ -83,8 +86,8 @@ class SimpleMithraAI:
             
             points = beautiful_content.get('eco_points', 0)
             impact = beautiful_content.get('environmental_impact', {})
-            print(f"✅ Content generated: {points} eco points awarded")
-            print(f"🌱 Environmental impact: {impact.get('co2_saved', 0)}kg CO2 saved")
+            logger.info("✅ Content generated: %s eco points awarded", points)
+            logger.debug("🌱 Environmental impact: %skg CO2 saved", impact.get('co2_saved', 0))
             
             # STEP 5: Final Assembly
             final_result = {
@@ -94,17 +97,15 @@ class SimpleMithraAI:
                 "validation": validation,
                 "beautiful_content": beautiful_content,
                 "processing_time": 3.0,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
             }
             
-            print("\n" + "="*50)
-            print("🎉 AI Pipeline completed successfully!")
-            print("="*50)
+            logger.info("🎉 AI Pipeline completed successfully!")
             
             return final_result
             
         except Exception as e:
-            print(f"❌ Error: {e}")
+            logger.exception("❌ AI pipeline error")
             return {
                 "status": "error",
                 "error": str(e),
@@ -114,23 +115,24 @@ class SimpleMithraAI:
     async def _upload_to_cloudinary(self, images: List[Dict]) -> List[str]:
         """Upload images to Cloudinary"""
         urls = []
+        timestamp = time.time_ns() // 1_000_000_000
         
         for idx, img_data in enumerate(images):
             try:
                 image_path = img_data.get("file_path")
                 if not os.path.exists(image_path):
-                    print(f"⚠️  Image {idx+1} not found at path")
+                    logger.warning("⚠️ Image %s not found at path", idx + 1)
                     continue
                 
                 # Upload to Cloudinary
                 result = cloudinary.uploader.upload(
                     image_path,
                     folder="meri_dharani",
-                    public_id=f"waste_{int(datetime.utcnow().timestamp())}_{idx}"
+                    public_id=f"waste_{timestamp}_{idx}"
                 )
                 
                 urls.append(result.get("secure_url"))
-                print(f"  📤 Image {idx+1}: Upload complete")
+                logger.debug("📤 Image %s: Upload complete", idx + 1)
                 
                 # Delete local file
                 try:
@@ -139,7 +141,7 @@ class SimpleMithraAI:
                     pass
                     
             except Exception as e:
-                print(f"  ❌ Upload failed for image {idx+1}: {str(e)[:50]}...")
+                logger.error("❌ Upload failed for image %s: %s", idx + 1, e)
                 
         return urls
 
@@ -156,7 +158,7 @@ class SimpleMithraAI:
                 img.save(buffered, format="JPEG", quality=80)
                 img_b64 = base64.b64encode(buffered.getvalue()).decode()
             
-            print("  🧠 Sending image to AI model...")
+            logger.debug("🧠 Sending image to AI model...")
             
             # Call Groq Vision API
             response = self.groq_client.chat.completions.create(
@@ -199,11 +201,11 @@ class SimpleMithraAI:
                 "ai_model": "llama-4-scout-17b"
             }
             
-            print(f"  🎯 AI detected: {waste_type} waste")
+            logger.debug("🎯 AI detected: %s waste", waste_type)
             return result
             
         except Exception as e:
-            print(f"  ❌ AI analysis failed: {str(e)[:50]}...")
+            logger.error("❌ AI analysis failed: %s", e)
             return {
                 "description": "Could not analyze image",
                 "waste_type": "unknown",
@@ -214,7 +216,7 @@ class SimpleMithraAI:
     async def _validate_request_simple(self, user_description: str, ai_analysis: Dict) -> Dict:
         """Validate if request is genuine waste report"""
         try:
-            print("  🔍 Cross-checking user description with AI analysis...")
+            logger.debug("🔍 Cross-checking user description with AI analysis...")
             
             # Basic validation rules
             if len(user_description.strip()) < 5:
@@ -263,17 +265,17 @@ class SimpleMithraAI:
                 "ai_validation": True
             }
             
-            print(f"  ✅ Validation: {'PASS' if is_valid else 'FAIL'} (score: {score}/10)")
+            logger.debug("✅ Validation: %s (score: %s/10)", "PASS" if is_valid else "FAIL", score)
             return result
             
         except Exception as e:
-            print(f"  ⚠️  Validation error, defaulting to valid: {str(e)[:30]}...")
+            logger.warning("⚠️ Validation error, defaulting to valid: %s", e)
             return {"is_valid": True, "score": 6, "reason": "Validation service unavailable"}
 
     async def _beautify_content_simple(self, user_description: str, ai_analysis: Dict, location: Dict) -> Dict:
         """AI generates dynamic JSON fields including cleaned description"""
         try:
-            print("  ✨ Creating dynamic JSON insights...")
+            logger.debug("✨ Creating dynamic JSON insights...")
             
             waste_type = ai_analysis.get('waste_type', 'mixed')
             area = location.get('address', 'unknown')
@@ -315,11 +317,10 @@ class SimpleMithraAI:
             )
             
             # Parse the dynamic JSON response
-            json_response = response.choices[0].message.content.strip()
-            return json.loads(json_response)
+            return orjson.loads(response.choices[0].message.content)
             
         except Exception as e:
-            print(f"  ⚠️  Dynamic fallback: {str(e)[:20]}...")
+            logger.warning("⚠️ Dynamic fallback: %s", e)
             return {
                 "cleaned_description": f"Waste cleanup required for {waste_type} materials in {area}. Professional assessment and removal needed.",
                 "title": f"{waste_type.title()} Waste Management",
@@ -329,16 +330,102 @@ class SimpleMithraAI:
                 "category": waste_type
             }
 
+class RequestInsertBatcher:
+    """Coalesce concurrent request inserts into one insert_many round trip"""
+
+    def __init__(self, max_batch: int = 50, max_wait: float = 0.1):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = None
+        self._worker = None
+
+    async def insert(self, collection, doc: Dict) -> str:
+        """Queue a document for the next batch and wait for its inserted id"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain())
+
+        # Assign the id up front so every caller knows its own result
+        doc.setdefault("_id", ObjectId())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((collection, doc, future))
+        return await future
+
+    async def _drain(self):
+        """Flush up to max_batch ready jobs per insert_many, waiting at most max_wait"""
+        loop = asyncio.get_running_loop()
+        jobs = []
+        try:
+            while True:
+                jobs = [await self._queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(jobs) < self.max_batch:
+                    try:
+                        jobs.append(self._queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            jobs.append(await asyncio.wait_for(self._queue.get(), remaining))
+                        except asyncio.TimeoutError:
+                            break
+                try:
+                    await self._flush(jobs)
+                except Exception as e:
+                    # Fail this batch only - the worker keeps serving later inserts
+                    logger.error("❌ Request insert batch failed: %s", e)
+                    self._fail(jobs, e)
+        except BaseException:
+            # Worker stopping (cancelled) - nobody will flush what it holds, so release those callers
+            while not self._queue.empty():
+                jobs.append(self._queue.get_nowait())
+            for _, _, future in jobs:
+                if not future.done():
+                    future.cancel()
+            raise
+
+    @staticmethod
+    def _fail(jobs: List, error: Exception):
+        """Resolve every still-pending future of a batch with error"""
+        for _, _, future in jobs:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _flush(self, jobs: List):
+        """Insert one batch per collection and resolve each caller's future"""
+        by_collection = {}
+        for collection, doc, future in jobs:
+            by_collection.setdefault(id(collection), (collection, []))[1].append((doc, future))
+
+        for collection, entries in by_collection.values():
+            failed = {}
+            try:
+                await collection.insert_many([doc for doc, _ in entries], ordered=False)
+            except BulkWriteError as bwe:
+                for error in bwe.details.get("writeErrors", []):
+                    failed[error["index"]] = Exception(error.get("errmsg", "insert failed"))
+            except Exception as e:
+                failed = {index: e for index in range(len(entries))}
+
+            for index, (doc, future) in enumerate(entries):
+                if future.done():
+                    continue
+                if index in failed:
+                    future.set_exception(failed[index])
+                else:
+                    future.set_result(str(doc["_id"]))
+
+request_insert_batcher = RequestInsertBatcher()
+
 async def store_request_with_mithra_insights(db, user_id: str, request_data: Dict, mithra_insights: Dict) -> str:
     """Store the request in 'requests' collection"""
     try:
-        print(f"\n💾 Storing request in database...")
-        print(f"  📊 Status: {mithra_insights.get('status', 'unknown')}")
-        print("SSS")
-        print(f"  🗄️  Database type: {type(db)}")
+        logger.debug("💾 Storing request in database (status: %s)", mithra_insights.get('status', 'unknown'))
         
         if db is None:
-            print("  ⚠️  No database connection - using demo mode")
+            logger.warning("⚠️ No database connection - using demo mode")
             return f"DEMO_{request_data.get('request_id', 'unknown')}"
         
         # Create database document
@@ -360,18 +447,18 @@ async def store_request_with_mithra_insights(db, user_id: str, request_data: Dic
         try:
             if hasattr(db, 'database') and db.database is not None:
                 requests_collection = db.database.requests  # ← REQUESTS COLLECTION
-                result = await requests_collection.insert_one(request_doc)
-                stored_id = str(result.inserted_id)
-                print(f"  ✅ Stored in REQUESTS collection: {stored_id}")
+                # Batched with other in-flight requests: one insert_many per flush
+                stored_id = await request_insert_batcher.insert(requests_collection, request_doc)
+                logger.debug("✅ Stored in REQUESTS collection: %s", stored_id)
                 return stored_id
             else:
-                print(f"  ❌ No database.requests collection found")
+                logger.error("❌ No database.requests collection found")
                 return f"ERROR_{request_data.get('request_id', 'unknown')}"
                 
         except Exception as db_error:
-            print(f"  ❌ Database error: {str(db_error)}")
+            logger.exception("❌ Database error while storing request")
             return f"ERROR_{request_data.get('request_id', 'unknown')}"
         
     except Exception as e:
-        print(f"  ❌ Storage failed: {str(e)}")
+        logger.exception("❌ Storage failed")
         return f"ERROR_{request_data.get('request_id', 'unknown')}"
\ No newline at end of file
@@ -1,9 +1,11 @@
 # app/citizen/api_routes.py - FINAL SIMPLE VERSION
 
 from fastapi import APIRouter, HTTPException, Request, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from typing import List, Dict, Any
 from datetime import datetime
+import logging
+import time
 import uuid
 import base64
 import os
@@ -11,19 +13,34 @@ import geohash2 as gh
 
 # Import AI service
 from .ai_service import SimpleMithraAI, store_request_with_mithra_insights
+from ..shared.user_cache import get_user_cache, invalidate_user_cache
+from ..shared.utils import revalidated_json
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/citizen/api", tags=["citizen-requests"])
 mithra_ai = SimpleMithraAI()
 
+# Statistics payloads per user id (dropped when that user's new request is
+# stored); the browser keeps a copy but revalidates it by ETag
+_stats_cache = get_user_cache("citizen_api_stats", ttl=60)
+
+# Session users read straight from Mongo, keyed by the session user id
+_session_user_cache = get_user_cache("citizen_api_session", ttl=30)
+# The request API only needs who the user is and their language
+_SESSION_USER_PROJECTION = {"fullName": 1, "email": 1, "role": 1, "language": 1}
+# Default/demo stats must not be kept by the browser - they retry next call
+_STATS_NO_STORE_HEADERS = {"Cache-Control": "no-store"}
+
 async def get_database():
     """Get real database connection"""
     try:
         from ..shared.database import database
-        print(f"🔍 Database connected: {database.is_connected}")
-        print(f"🔍 Database object: {database.database}")
+        logger.debug("🔍 Database connected: %s", database.is_connected)
+        logger.debug("🔍 Database object: %s", database.database)
         return database  # This is correct - storage function will use database.database
     except Exception as e:
-        print(f"❌ Database error: {e}")
+        logger.error("❌ Database error: %s", e)
         return None
 
 async def get_current_user_from_session(request):
@@ -42,6 +59,10 @@ async def get_current_user_from_session(request):
                 "language": "en"
             }
         
+        user = _session_user_cache.get(user_session)
+        if user is not None:
+            return user
+        
         # Try to get real user from database
         try:
             from ..shared.database import database
@@ -52,12 +73,13 @@ async def get_current_user_from_session(request):
                 database.is_connected):
                 
                 # Try to find user by session
-                user = await database.database.users.find_one({"_id": user_session})
+                user = await database.database.users.find_one({"_id": user_session}, _SESSION_USER_PROJECTION)
                 if user:
                     user["_id"] = str(user["_id"])
+                    _session_user_cache[user_session] = user
                     return user
         except Exception as e:
-            print(f"Database user lookup error: {e}")
+            logger.warning("⚠️ Database user lookup error: %s", e)
             
         # Fallback to demo user with session ID
         return {
@@ -69,7 +91,7 @@ async def get_current_user_from_session(request):
         }
         
     except Exception as e:
-        print(f"Session error: {e}")
+        logger.warning("⚠️ Session error: %s", e)
         return {
             "_id": "demo_user_123",
             "fullName": "Demo User",
@@ -135,7 +157,7 @@ async def process_request_simple(
 ):
     """SIMPLE background processing"""
     try:
-        print(f"🤖 Processing {request_id}")
+        logger.debug("🤖 Processing %s", request_id)
         
         # Run AI pipeline
         mithra_insights = await mithra_ai.complete_analysis_pipeline(
@@ -143,7 +165,7 @@ async def process_request_simple(
             user_language=user_language
         )
         
-        print(f"🔍 AI Result: {mithra_insights.get('status', 'unknown')}")
+        logger.debug("🔍 AI Result: %s", mithra_insights.get('status', 'unknown'))
         
         # If successful, store in database
         if mithra_insights.get("status") == "success":
@@ -153,29 +175,30 @@ async def process_request_simple(
                 request_data=request_data, 
                 mithra_insights=mithra_insights
             )
-            print(f"💾 Stored: {final_req_id}")
+            logger.info("💾 Stored: %s", final_req_id)
+            invalidate_user_cache(user_id)
         else:
-            print(f"❌ Not stored - Status: {mithra_insights.get('status')}")
+            logger.warning("❌ Not stored - Status: %s", mithra_insights.get('status'))
         
-        print(f"✅ Processing complete for {request_id}")
+        logger.debug("✅ Processing complete for %s", request_id)
         
     except Exception as e:
-        print(f"❌ Processing failed for {request_id}: {e}")
+        logger.exception("❌ Processing failed for %s", request_id)
 
 # Helper functions
 def generate_location_based_id(latitude: float, longitude: float) -> str:
+    timestamp = time.time_ns() // 1_000_000_000
     try:
         geohash = gh.encode(latitude, longitude, precision=6)
-        timestamp = int(datetime.utcnow().timestamp())
         random_suffix = str(uuid.uuid4())[:6].upper()
         return f"REQ-{geohash.upper()}-{timestamp}-{random_suffix}"
     except:
-        timestamp = int(datetime.utcnow().timestamp())
         random_suffix = str(uuid.uuid4())[:8].upper()
         return f"REQ-{timestamp}-{random_suffix}"
 
 async def process_request_images(images_data: List[Dict], request_id: str) -> List[Dict]:
     processed_images = []
+    upload_timestamp = datetime.utcnow()  # One timestamp for the whole batch
     
     for idx, img_data in enumerate(images_data):
         try:
@@ -188,12 +211,12 @@ async def process_request_images(images_data: List[Dict], request_id: str) -> Li
                 "name": img_data["name"],
                 "size": img_data.get("size", 0),
                 "file_path": file_path,
-                "upload_timestamp": datetime.utcnow(),
+                "upload_timestamp": upload_timestamp,
                 "index": idx + 1
             })
             
         except Exception as e:
-            print(f"❌ Error processing image {idx}: {e}")
+            logger.warning("❌ Error processing image %s: %s", idx, e)
             continue
     
     return processed_images
@@ -215,7 +238,7 @@ async def save_image_file(data_url: str, filename: str) -> str:
         return file_path
         
     except Exception as e:
-        print(f"❌ Error saving image {filename}: {e}")
+        logger.error("❌ Error saving image %s: %s", filename, e)
         return f"uploads/waste_images/{filename}"
 
 @router.get("/requests/{request_id}/status")
@@ -229,7 +252,7 @@ async def get_request_status(request_id: str):
         }
     }
 
-@router.get("/statistics")
+@router.get("/statistics", response_class=ORJSONResponse)
 async def get_citizen_statistics(request: Request):
     """📊 GET CITIZEN STATISTICS API - FIXED structure to match frontend"""
     try:
@@ -237,7 +260,13 @@ async def get_citizen_statistics(request: Request):
         user = await get_current_user_from_session(request)
         user_id = str(user.get("_id", "demo_user_123"))
         
-        print(f"📊 Getting statistics for user: {user_id}")
+        logger.debug("📊 Getting statistics for user: %s", user_id)
+        
+        cached = _stats_cache.get(user_id)
+        if cached is not None:
+            return revalidated_json(request, cached)
+        
+        from_database = False
         
         # Initialize stats with CORRECT field names that frontend expects
         stats = {
@@ -261,20 +290,30 @@ async def get_citizen_statistics(request: Request):
             from ..shared.database import database
             
             # Check database availability
-            if (hasattr(database, 'is_connected') and database.is_connected and
-                hasattr(database, 'database') and database.database is not None):
-                
-                print("✅ Database available - calculating statistics")
+            if database.ready:
                 
-                # Get all user requests
-                requests_cursor = database.database.requests.find({
-                    "user_id": user_id
-                })
+                logger.debug("✅ Database available - calculating statistics")
                 
-                requests = await requests_cursor.to_list(length=100)
+                # Let MongoDB bucket the user's requests by status and sum the
+                # impact figures - one small doc per status comes back
+                pipeline = [
+                    {"$match": {"user_id": user_id}},
+                    {"$group": {
+                        "_id": "$status",
+                        "count": {"$sum": 1},
+                        "waste": {"$sum": "$environmental_impact.waste_collected_kg"},
+                        "co2": {"$sum": "$environmental_impact.co2_saved_kg"},
+                        "trees": {"$sum": "$environmental_impact.trees_equivalent"},
+                        "water": {"$sum": "$environmental_impact.water_saved_liters"},
+                        "score": {"$sum": "$environmental_impact.environmental_score"}
+                    }}
+                ]
+                # No hint: the planner already picks (user_id, status), and a hint for a
+                # missing (or still building) index would fail the whole command
+                status_groups = await database.requests.aggregate(pipeline).to_list(length=None)
                 
                 # 🔥 CALCULATE STATISTICS WITH CORRECT MAPPING
-                total_requests = len(requests)
+                total_requests = 0
                 submitted_count = 0
                 processing_count = 0
                 assigned_count = 0
@@ -286,36 +325,35 @@ async def get_citizen_statistics(request: Request):
                 total_trees = 0
                 total_water = 0
                 
-                print(f"🔧 Processing {total_requests} requests for statistics")
-                
-                for req in requests:
-                    status = req.get("status", "submitted")
-                    print(f"🔧 Request {req.get('request_id')} has status: {status}")
+                for group in status_groups:
+                    status = group["_id"] or "submitted"
+                    count = group["count"]
+                    total_requests += count
                     
                     # Count by status - handle all possible status values
                     if status == "submitted":
-                        submitted_count += 1
+                        submitted_count += count
                     elif status == "processing" or status == "ai_analyzed":
-                        processing_count += 1
+                        processing_count += count
                     elif status == "assigned" or status == "worker_assigned":
-                        assigned_count += 1
+                        assigned_count += count
                     elif status == "in_progress" or status == "in-progress":
-                        in_progress_count += 1
+                        in_progress_count += count
                     elif status == "completed":
-                        completed_count += 1
+                        completed_count += count
                     else:
                         # Default unknown status to submitted
-                        submitted_count += 1
-                        print(f"⚠️ Unknown status '{status}', counting as submitted")
+                        submitted_count += count
+                        logger.debug("⚠️ Unknown status '%s', counting as submitted", status)
                     
-                    # Calculate environmental impact
-                    env_impact = req.get("environmental_impact", {})
-                    if env_impact:
-                        total_waste += float(env_impact.get("waste_collected_kg", 0))
-                        total_co2 += float(env_impact.get("co2_saved_kg", 0))
-                        total_trees += float(env_impact.get("trees_equivalent", 0))
-                        total_water += float(env_impact.get("water_saved_liters", 0))
-                        total_impact_score += float(env_impact.get("environmental_score", 0))
+                    # Environmental impact (already summed per status)
+                    total_waste += group["waste"]
+                    total_co2 += group["co2"]
+                    total_trees += group["trees"]
+                    total_water += group["water"]
+                    total_impact_score += group["score"]
+                
+                logger.debug("🔧 Processed %s requests for statistics", total_requests)
                 
                 # Calculate active requests (everything except completed)
                 active_count = submitted_count + processing_count + assigned_count + in_progress_count
@@ -338,20 +376,24 @@ async def get_citizen_statistics(request: Request):
                     }
                 }
                 
-                print(f"✅ Final statistics: {stats}")
+                from_database = True
+                logger.debug("✅ Final statistics: %s", stats)
             else:
-                print("⚠️ Database not available - using default stats")
+                logger.warning("⚠️ Database not available - using default stats")
                 
         except Exception as e:
-            print(f"❌ Statistics query failed: {e}")
-            import traceback
-            print(f"🔧 Full traceback: {traceback.format_exc()}")
+            logger.exception("❌ Statistics query failed")
         
-        return {
+        payload = {
             "success": True,
             "statistics": stats
         }
+        # Only real numbers are cached - demo/default stats retry next call
+        if from_database:
+            _stats_cache[user_id] = payload
+            return revalidated_json(request, payload)
+        return ORJSONResponse(payload, headers=_STATS_NO_STORE_HEADERS)
         
     except Exception as e:
-        print(f"❌ Statistics API error: {e}")
+        logger.exception("❌ Statistics API error")
         raise HTTPException(status_code=500, detail="Failed to get statistics")
\ No newline at end of file
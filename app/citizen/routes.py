@@ -1,22 +1,84 @@
 # app/citizen/routes.py - Updated with Session Management (No more URL parameters!)
-from fastapi import APIRouter, HTTPException, status, Depends, Request, File, UploadFile
+import asyncio
+import base64
+import copy
+import io
+import logging
+import os
+import types
+from functools import lru_cache
+from fastapi import APIRouter, HTTPException, status, Depends, Request, File, Form, UploadFile
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
-from datetime import datetime, timedelta
+from jinja2 import FileSystemBytecodeCache
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 from bson import ObjectId
+from pymongo import ReturnDocument
+import orjson
+from cachetools import TTLCache
+from pydantic import ValidationError
 
-from ..shared.database import get_database
+from ..shared.database import database, get_database
 from ..shared.models import UserModel
+from ..shared.user_cache import get_user_cache, invalidate_user_cache
+from ..shared.utils import revalidated_json
+from .schemas import CitizenProfileUpdate
 from .services import citizen_service
 
+logger = logging.getLogger(__name__)
+
 # CHANGE THE ROUTER DEFINITION:
 router = APIRouter(
     prefix="/citizen",  # Keep this as /citizen
     tags=["EcoWarrior"]
 )
+
 # Templates
 templates = Jinja2Templates(directory="templates")
 
+# Compiled template bytecode is kept on disk so worker restarts skip recompiling
+os.makedirs(".jinja_cache", exist_ok=True)
+templates.env.bytecode_cache = FileSystemBytecodeCache(".jinja_cache")
+
+@lru_cache(maxsize=None)
+def _get_template(name: str):
+    """Resolve a citizen template once per process (restart to pick up edits)"""
+    return templates.get_template(name)
+
+def _render(name: str, context: Dict[str, Any]) -> HTMLResponse:
+    """Render a cached template straight to an HTMLResponse"""
+    return HTMLResponse(_get_template(name).render(context))
+
+class _UTCJSONResponse(ORJSONResponse):
+    """ORJSONResponse that writes datetimes itself as ...Z UTC strings"""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z)
+
+# Session users keyed by their own user id (never by route) - short TTL,
+# dropped explicitly by the profile endpoints when the document changes
+_session_user_cache = get_user_cache("citizen_session", ttl=60)
+
+# Statistics payloads per user id - the browser keeps a copy but revalidates it by ETag
+_stats_cache = get_user_cache("citizen_page_stats", ttl=60)
+# Default/demo stats must not be kept by the browser - they retry next call
+_STATS_NO_STORE_HEADERS = {"Cache-Control": "no-store"}
+
+# Fields the citizen pages and APIs read off the session user - password hashes,
+# tokens and audit history stay in Mongo
+_SESSION_USER_PROJECTION = {
+    "fullName": 1, "email": 1, "phone": 1, "location": 1, "citizenProfile": 1,
+    "reputation": 1, "profilePicture": 1, "role": 1, "createdAt": 1, "isActive": 1,
+    "isVerified": 1, "emailVerified": 1, "phoneVerified": 1
+}
+
+# Fallback user for every no-session / error path - built once, copied per use
+_DEMO_CITIZEN = citizen_service.create_demo_citizen()
+
+def _demo_citizen() -> Dict[str, Any]:
+    """A private copy of the demo user - callers may mutate what they get back"""
+    return copy.deepcopy(_DEMO_CITIZEN)
+
 # ===================
 # SESSION HELPER FUNCTION
 # ===================
@@ -26,78 +88,201 @@ async def get_current_user_from_session(request: Request) -> Dict[str, Any]:
     try:
         # Get user ID from session cookie
         user_id = request.cookies.get("user_session")
-        print(f"🔍 Session cookie value: {user_id}")
+        logger.debug("🔍 Session cookie value: %s", user_id)
         
         if not user_id:
-            print("⚠️ No session cookie found, using demo user")
-            return citizen_service.create_demo_citizen()
+            logger.debug("⚠️ No session cookie found, using demo user")
+            return _demo_citizen()
         
-        print(f"🔍 Found session for user ID: {user_id}")
+        logger.debug("🔍 Found session for user ID: %s", user_id)
+        
+        # The cache keeps its own snapshot - every caller gets a private copy to mutate
+        user = _session_user_cache.get(user_id)
+        if user is not None:
+            return copy.deepcopy(user)
         
         # Get user from database using the session user ID
-        user = await citizen_service.get_citizen_by_id(user_id)
+        user = await citizen_service.get_citizen_by_id(user_id, _SESSION_USER_PROJECTION)
         
         if user:
-            print(f"✅ User loaded from session: {user['fullName']}")
+            logger.debug("✅ User loaded from session: %s", user['fullName'])
+            _session_user_cache[user_id] = copy.deepcopy(user)
             return user
         else:
-            print(f"⚠️ User not found for ID: {user_id}, using demo")
-            return citizen_service.create_demo_citizen()
+            logger.warning("⚠️ User not found for ID: %s, using demo", user_id)
+            return _demo_citizen()
             
     except Exception as e:
-        print(f"❌ Error getting user from session: {e}")
-        return citizen_service.create_demo_citizen()
+        logger.exception("❌ Error getting user from session")
+        return _demo_citizen()
 
 # ===================
 # WEB PAGE ROUTES (UPDATED WITH SESSION)
 # ===================
 
-@router.get("/dashboard")
-async def citizen_dashboard_page(request: Request):
-    """EcoWarrior dashboard page - Now uses session management"""
-    try:
-        # ðŸ”¥ GET USER FROM SESSION (No more URL parameters!)
-        print("ðŸŽ¯ DEBUG: Dashboard route called")  # Add this
-        user = await get_current_user_from_session(request)
-        print(f"ðŸŽ¯ DEBUG: User returned: {user.get('fullName', 'Unknown')}")
-        
-        print(f"ðŸ  Dashboard loaded for: {user['fullName']} (Reports: {user['citizenProfile']['totalReports']})")
-        
-        return templates.TemplateResponse("citizen/dashboard.html", {
-            "request": request,
-            "user": user
-        })
-        
-    except Exception as e:
-        print(f"âŒ Dashboard error: {e}")
-        fallback_user = citizen_service.create_demo_citizen()
-        return templates.TemplateResponse("citizen/dashboard.html", {
-            "request": request,
-            "user": fallback_user,
-            "error": "Failed to load dashboard data"
-        })
+def _page(template: str, label: str, message: Optional[str] = None, fallback_error: Optional[str] = None):
+    """Build a GET handler that renders a citizen page for the session user.
+    
+    With fallback_error the page re-renders for the demo user on failure,
+    otherwise the failure becomes a 500.
+    """
+    async def render_page(request: Request, user: Dict[str, Any] = Depends(get_current_user_from_session)):
+        context = {"request": request, "user": user}
+        if message:
+            context["message"] = message
+        try:
+            return _render(template, context)
+        except Exception:
+            logger.exception("❌ %s page error", label)
+            if fallback_error is None:
+                raise HTTPException(status_code=500, detail=f"Failed to load {label} page")
+            return _render(template, {
+                "request": request,
+                "user": _demo_citizen(),
+                "error": fallback_error
+            })
+    
+    return render_page
+
+# (path, template, label, message, fallback_error)
+_PAGES = [
+    ("/dashboard", "citizen/dashboard.html", "dashboard", None, "Failed to load dashboard data"),
+    ("/profile", "citizen/profile.html", "profile", None, "Failed to load profile data"),
+    ("/new-request", "citizen/new-request.html", "new request", "🆕 New service request form coming soon...", None),
+    ("/leaderboard", "citizen/leaderboard.html", "leaderboard", "🏆 Leaderboard coming soon...", None),
+    ("/help", "citizen/help.html", "help", "❓ Help & support coming soon...", None),
+]
+
+for _path, _template, _label, _message, _fallback_error in _PAGES:
+    router.add_api_route(
+        _path,
+        _page(_template, _label, _message, _fallback_error),
+        methods=["GET"],
+        name=f"citizen_{_label.replace(' ', '_')}_page"
+    )
 
-@router.get("/profile")
-async def citizen_profile_page(request: Request):
-    """EcoWarrior profile page - Now uses session management"""
+# ===================
+# MY-REQUESTS HELPERS
+# ===================
+
+_DATETIME_FIELDS = ("updated_at", "completed_at", "assigned_at")
+
+# created_at card format + unbound datetime methods, resolved once at import
+_DISPLAY_FMT = "%d %b %Y, %I:%M %p"
+_strftime = datetime.strftime
+_isoformat = datetime.isoformat
+
+# Shared read-only default for requests without an impact estimate yet
+_EMPTY_IMPACT = types.MappingProxyType({
+    "waste_collected_kg": 0,
+    "co2_saved_kg": 0,
+    "trees_equivalent": 0,
+    "environmental_score": 0
+})
+
+_ACTIVE_STATUSES = frozenset({"submitted", "processing", "assigned", "in_progress"})
+
+def _script_json(data: Any) -> str:
+    """orjson-encode data for a <script> block, escaped the same way as |tojson"""
+    return (
+        orjson.dumps(data, default=dict).decode()
+        .replace("<", "\\u003c")
+        .replace(">", "\\u003e")
+        .replace("&", "\\u0026")
+        .replace("'", "\\u0027")
+    )
+
+# Fields my_requests.html reads - cards, stats and the detail modal (which
+# renders from the embedded JSON, so it needs ai_analysis/location/photos too)
+_MY_REQUESTS_PROJECTION = {
+    "request_id": 1,
+    "status": 1,
+    "user_description": 1,
+    "description": 1,
+    "title": 1,
+    "category": 1,
+    "content": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "completed_at": 1,
+    "assigned_at": 1,
+    "assigned_worker": 1,
+    "environmental_impact": 1,
+    "ai_analysis.waste_type": 1,
+    "ai_analysis.confidence": 1,
+    "ai_analysis.quantity_estimate": 1,
+    "ai_analysis.priority": 1,
+    "cloudinary_urls": 1,
+    "location.address": 1,
+    "location.latitude": 1,
+    "location.longitude": 1,
+}
+
+def _normalize_request(req: Dict[str, Any], now_iso: str) -> None:
+    """Make one stored request JSON-safe for my_requests.html in a single pass.
+    
+    now_iso stands in for a missing created_at; the caller
+    computes it once per page load.
+    """
+    req["_id"] = str(req["_id"])
+    
+    # created_at: ISO string for tojson + display string for the card.
+    # Every writer stores a BSON date, which PyMongo hands back as datetime.
+    created_at = req.get("created_at")
+    if created_at:
+        req["created_at"] = _isoformat(created_at)
+        req["created_at_display"] = _strftime(created_at, _DISPLAY_FMT)
+    else:
+        req["created_at"] = now_iso
+        req["created_at_display"] = "Recently"
+    
+    # Other BSON dates the page ships to the browser
+    for field in _DATETIME_FIELDS:
+        value = req.get(field)
+        if isinstance(value, datetime):
+            req[field] = _isoformat(value)
+    
+    # 🔥 ENSURE REQUIRED FIELDS EXIST (for your template)
+    if not req.get("content"):
+        req["content"] = {
+            "title": req.get("title", "Waste Management Request"),
+            "category": req.get("category", "mixed")
+        }
+    
+    if not req.get("status"):
+        req["status"] = "submitted"
+    
+    if not req.get("user_description"):
+        req["user_description"] = req.get("description", "No description provided")
+    
+    # 🔥 ENSURE environmental_impact exists (your template checks this)
+    if not req.get("environmental_impact"):
+        req["environmental_impact"] = _EMPTY_IMPACT
+
+async def _load_my_requests(user_id: str) -> List[Dict[str, Any]]:
+    """Latest 50 requests for a user, normalized for my_requests.html ([] without a database)"""
+    if not database.ready:
+        logger.warning("⚠️ Database not available - using empty list")
+        return []
+    
+    # Only the Mongo round-trip is guarded; a failure in the normalizer is a
+    # bug and goes to the page's own error handler
     try:
-        # ðŸ”¥ GET USER FROM SESSION (No more URL parameters!)
-        user = await get_current_user_from_session(request)
-        
-        print(f"ðŸ‘¤ Profile loaded for: {user['fullName']}")
-        
-        return templates.TemplateResponse("citizen/profile.html", {
-            "request": request,
-            "user": user
-        })
-        
-    except Exception as e:
-        print(f"âŒ Profile error: {e}")
-        return templates.TemplateResponse("citizen/profile.html", {
-            "request": request,
-            "user": citizen_service.create_demo_citizen(),
-            "error": "Failed to load profile data"
-        })
+        requests_cursor = database.requests.find(
+            {"user_id": user_id},
+            _MY_REQUESTS_PROJECTION
+        ).sort("created_at", -1).batch_size(50).limit(50)
+        requests = await requests_cursor.to_list(length=50)
+    except Exception:
+        logger.exception("❌ Database query failed")
+        return []
+    
+    now_iso = datetime.now(timezone.utc).isoformat()
+    for req in requests:
+        _normalize_request(req, now_iso)
+    
+    logger.debug("✅ Found and processed %s real requests", len(requests))
+    return requests
 
 @router.get("/my-requests") 
 async def my_requests_page(request: Request):
@@ -108,14 +293,16 @@ async def my_requests_page(request: Request):
         if not user_id:
             user_id = "demo_user_123"
         
-        # Get user data
-        user = await citizen_service.get_citizen_by_id(user_id)
-        if not user:
-            user = citizen_service.create_demo_citizen()
+        logger.debug("📊 Loading my-requests for user: %s", user_id)
         
-        print(f"📊 Loading my-requests for user: {user_id}")
+        # User document and request list are independent - fetch them concurrently
+        user, requests = await asyncio.gather(
+            citizen_service.get_citizen_by_id(user_id, _SESSION_USER_PROJECTION),
+            _load_my_requests(user_id)
+        )
+        if not user:
+            user = _demo_citizen()
         
-        requests = []
         stats = {
             "total": 0,
             "active": 0, 
@@ -123,145 +310,45 @@ async def my_requests_page(request: Request):
             "impactScore": 0
         }
         
-        try:
-            from ..shared.database import database
-            
-            # Check database availability
-            if (hasattr(database, 'is_connected') and database.is_connected and
-                hasattr(database, 'database') and database.database is not None):
-                
-                print("✅ Database is available - querying requests")
-                
-                # Get requests from 'requests' collection
-                requests_cursor = database.database.requests.find({
-                    "user_id": user_id
-                }).sort("created_at", -1).limit(50)
-                
-                requests = await requests_cursor.to_list(length=50)
-                
-                # 🔥 FINAL FIX: Process each request for BOTH template strftime AND tojson
-                for req in requests:
-                    # Convert ObjectId to string
-                    req["_id"] = str(req["_id"])
-                    
-                    # 🔥 CRITICAL: Handle created_at for BOTH uses
-                    if req.get("created_at"):
-                        if isinstance(req["created_at"], datetime):
-                            # Keep original datetime for strftime
-                            original_dt = req["created_at"]
-                            # Convert to ISO string for JSON serialization
-                            req["created_at"] = original_dt.isoformat()
-                            # Add formatted display version
-                            req["created_at_display"] = original_dt.strftime('%d %b %Y, %I:%M %p')
-                            req["created_at_obj"] = original_dt  # Keep original for template if needed
-                        elif isinstance(req["created_at"], str):
-                            try:
-                                # Parse string to datetime
-                                dt = datetime.fromisoformat(req["created_at"].replace('Z', '+00:00'))
-                                req["created_at"] = dt.isoformat()  # ISO string for JSON
-                                req["created_at_display"] = dt.strftime('%d %b %Y, %I:%M %p')
-                                req["created_at_obj"] = dt
-                            except:
-                                now = datetime.utcnow()
-                                req["created_at"] = now.isoformat()
-                                req["created_at_display"] = "Recently"
-                                req["created_at_obj"] = now
-                        else:
-                            now = datetime.utcnow()
-                            req["created_at"] = now.isoformat()
-                            req["created_at_display"] = "Recently"
-                            req["created_at_obj"] = now
-                    else:
-                        now = datetime.utcnow()
-                        req["created_at"] = now.isoformat()
-                        req["created_at_display"] = "Recently"
-                        req["created_at_obj"] = now
-                    
-                    # 🔥 FIX: Handle other datetime fields
-                    if req.get("updated_at") and isinstance(req["updated_at"], datetime):
-                        req["updated_at"] = req["updated_at"].isoformat()
-                    
-                    if req.get("completed_at") and isinstance(req["completed_at"], datetime):
-                        req["completed_at"] = req["completed_at"].isoformat()
-                    
-                    # 🔥 ENSURE REQUIRED FIELDS EXIST (for your template)
-                    if not req.get("content"):
-                        req["content"] = {
-                            "title": req.get("title", "Waste Management Request"),
-                            "category": req.get("category", "mixed")
-                        }
-                    
-                    if not req.get("status"):
-                        req["status"] = "submitted"
-                    
-                    if not req.get("user_description"):
-                        req["user_description"] = req.get("description", "No description provided")
-                    
-                    # 🔥 ENSURE environmental_impact exists (your template checks this)
-                    if not req.get("environmental_impact"):
-                        req["environmental_impact"] = {
-                            "waste_collected_kg": 0,
-                            "co2_saved_kg": 0,
-                            "trees_equivalent": 0,
-                            "environmental_score": 0
-                        }
-                
-                print(f"✅ Found and processed {len(requests)} real requests")
-            else:
-                print("⚠️ Database not available - using empty list")
-                requests = []
-                        
-        except Exception as e:
-            print(f"❌ Database query failed: {e}")
-            import traceback
-            print(f"🔧 Full traceback: {traceback.format_exc()}")
-            requests = []
-        
-        # Calculate stats from real data
+        # Calculate stats from real data (single pass)
         if requests:
+            active = completed = 0
+            impact_score = 0
+            for req in requests:
+                req_status = req.get("status")
+                if req_status in _ACTIVE_STATUSES:
+                    active += 1
+                elif req_status == "completed":
+                    completed += 1
+                impact_score += req["environmental_impact"].get("environmental_score", 0) or 0
+            
             stats = {
                 "total": len(requests),
-                "active": len([r for r in requests if r.get("status") in ["submitted", "processing", "assigned", "in_progress"]]),
-                "completed": len([r for r in requests if r.get("status") == "completed"]),
-                "impactScore": sum([r.get("environmental_impact", {}).get("environmental_score", 0) for r in requests])
+                "active": active,
+                "completed": completed,
+                "impactScore": impact_score
             }
         
-        print(f"📊 Final stats: {stats}")
-        print(f"📋 Sending {len(requests)} requests to template")
-        
-        # 🔥 FINAL CHECK: Ensure all datetime objects are converted
-        def serialize_for_template(obj):
-            """Convert any remaining datetime objects to strings"""
-            if isinstance(obj, datetime):
-                return obj.isoformat()
-            elif isinstance(obj, dict):
-                return {key: serialize_for_template(value) for key, value in obj.items()}
-            elif isinstance(obj, list):
-                return [serialize_for_template(item) for item in obj]
-            return obj
-        
-        # Apply serialization
-        requests = serialize_for_template(requests)
-        stats = serialize_for_template(stats)
-        
-        return templates.TemplateResponse("citizen/my_requests.html", {
+        logger.debug("📊 Final stats: %s", stats)
+        logger.debug("📋 Sending %s requests to template", len(requests))
+        
+        return _render("citizen/my_requests.html", {
             "request": request,
             "user": user,
             "requests": requests,
+            "requests_json": _script_json(requests),
             "total_requests": len(requests),
             "stats": stats,
             "has_requests": len(requests) > 0
         })
         
     except Exception as e:
-        print(f"❌ My requests error: {e}")
-        import traceback
-        print(f"🔧 Full error traceback: {traceback.format_exc()}")
+        logger.exception("❌ My requests error")
         raise HTTPException(status_code=500, detail="Failed to load requests")
 
 # 🔥 FIX 2: Add this to app/citizen/api_routes.py - Add missing statistics endpoint
 
-@router.get("/statistics")
+@router.get("/statistics", response_class=ORJSONResponse)
 async def get_citizen_statistics(request: Request):
     """🔥 GET CITIZEN STATISTICS API - MISSING ENDPOINT"""
     try:
@@ -269,7 +356,13 @@ async def get_citizen_statistics(request: Request):
         user = await get_current_user_from_session(request)
         user_id = str(user.get("_id", "demo_user_123"))
         
-        print(f"📊 Getting statistics for user: {user_id}")
+        logger.debug("📊 Getting statistics for user: %s", user_id)
+        
+        cached = _stats_cache.get(user_id)
+        if cached is not None:
+            return revalidated_json(request, cached)
+        
+        from_database = False
         
         # Initialize default stats
         stats = {
@@ -288,25 +381,30 @@ async def get_citizen_statistics(request: Request):
             from ..shared.database import database
             
             # 🔥 FIX: Proper database check
-            if hasattr(database, 'database') and database.database and database.is_connected:
-                print("✅ Database available - calculating statistics")
-                
-                # Get all user requests
-                requests_cursor = database.database.requests.find({
-                    "user_id": user_id
-                })
+            if database.ready:
+                logger.debug("✅ Database available - calculating statistics")
                 
-                requests = await requests_cursor.to_list(length=100)
+                # Totals computed server-side - a single result doc comes back
+                pipeline = [
+                    {"$match": {"user_id": user_id}},
+                    {"$group": {
+                        "_id": None,
+                        "total": {"$sum": 1},
+                        "completed": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+                        "waste": {"$sum": {"$ifNull": ["$environmental_impact.waste_collected_kg", 0]}},
+                        "co2": {"$sum": {"$ifNull": ["$environmental_impact.co2_saved_kg", 0]}},
+                        "trees": {"$sum": {"$ifNull": ["$environmental_impact.trees_equivalent", 0]}}
+                    }}
+                ]
+                result = await database.requests.aggregate(pipeline).to_list(length=1)
+                totals = result[0] if result else {}
                 
-                # Calculate statistics
-                total_requests = len(requests)
-                completed_requests = len([r for r in requests if r.get("status") == "completed"])
+                total_requests = totals.get("total", 0)
+                completed_requests = totals.get("completed", 0)
                 pending_requests = total_requests - completed_requests
-                
-                # Calculate environmental impact
-                total_waste = sum([float(r.get("environmental_impact", {}).get("waste_collected_kg", 0)) for r in requests])
-                total_co2 = sum([float(r.get("environmental_impact", {}).get("co2_saved_kg", 0)) for r in requests])
-                total_trees = sum([float(r.get("environmental_impact", {}).get("trees_equivalent", 0)) for r in requests])
+                total_waste = totals.get("waste", 0)
+                total_co2 = totals.get("co2", 0)
+                total_trees = totals.get("trees", 0)
                 
                 stats = {
                     "totalRequests": total_requests,
@@ -320,291 +418,285 @@ async def get_citizen_statistics(request: Request):
                     }
                 }
                 
-                print(f"✅ Statistics calculated: {total_requests} total requests")
+                from_database = True
+                logger.debug("✅ Statistics calculated: %s total requests", total_requests)
             else:
-                print("⚠️ Database not available - using default stats")
+                logger.warning("⚠️ Database not available - using default stats")
                 
         except Exception as e:
-            print(f"❌ Statistics query failed: {e}")
+            logger.exception("❌ Statistics query failed")
         
-        return {
+        payload = {
             "success": True,
             "statistics": stats
         }
+        # Only real numbers are cached - demo/default stats retry next call
+        if from_database:
+            _stats_cache[user_id] = payload
+            return revalidated_json(request, payload)
+        return ORJSONResponse(payload, headers=_STATS_NO_STORE_HEADERS)
         
     except Exception as e:
-        print(f"❌ Statistics API error: {e}")
+        logger.exception("❌ Statistics API error")
         raise HTTPException(status_code=500, detail="Failed to get statistics")
 
-@router.get("/new-request")
-async def citizen_new_request_page(request: Request):
-    """EcoWarrior new service request page - Now uses session management"""
-    try:
-        # ðŸ”¥ GET USER FROM SESSION
-        user = await get_current_user_from_session(request)
-        
-        return templates.TemplateResponse("citizen/new-request.html", {
-            "request": request,
-            "user": user,
-            "message": "ðŸ†• New service request form coming soon..."
-        })
-        
-    except Exception as e:
-        print(f"âŒ New request error: {e}")
-        raise HTTPException(status_code=500, detail="Failed to load new request page")
-
-@router.get("/leaderboard")
-async def citizen_leaderboard_page(request: Request):
-    """EcoWarrior leaderboard page - Now uses session management"""
-    try:
-        # ðŸ”¥ GET USER FROM SESSION
-        user = await get_current_user_from_session(request)
-        
-        return templates.TemplateResponse("citizen/leaderboard.html", {
-            "request": request,
-            "user": user,
-            "message": "ðŸ† Leaderboard coming soon..."
-        })
-        
-    except Exception as e:
-        print(f"âŒ Leaderboard error: {e}")
-        raise HTTPException(status_code=500, detail="Failed to load leaderboard page")
-
-@router.get("/help")
-async def citizen_help_page(request: Request):
-    """EcoWarrior help page - Now uses session management"""
-    try:
-        # ðŸ”¥ GET USER FROM SESSION
-        user = await get_current_user_from_session(request)
-        
-        return templates.TemplateResponse("citizen/help.html", {
-            "request": request,
-            "user": user,
-            "message": "â“ Help & support coming soon..."
-        })
-        
-    except Exception as e:
-        print(f"âŒ Help error: {e}")
-        raise HTTPException(status_code=500, detail="Failed to load help page")
-
 # ===================
 # API ENDPOINTS (UPDATED WITH SESSION)
 # ===================
 
-@router.get("profile")
+@router.get("profile", response_model=None, response_class=ORJSONResponse)
 async def get_citizen_profile(request: Request):
     """Get citizen profile data via API - Now uses session"""
     try:
-        # ðŸ”¥ GET USER FROM SESSION
+        # 🔥 GET USER FROM SESSION
         user = await get_current_user_from_session(request)
         
         if not user:
             raise HTTPException(status_code=404, detail="Citizen profile not found")
         
-        return {
+        return ORJSONResponse({
             "success": True,
-            "user": user
-        }
+            "user": {key: value for key, value in user.items() if key != "_oid"}
+        })
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"âŒ API profile error: {e}")
+        logger.exception("❌ API profile error")
         raise HTTPException(status_code=500, detail="Failed to get profile")
 
+def _profile_update_fields(changes: Dict[str, Any]) -> Dict[str, Any]:
+    """$set document for a profile change - nested sections in dot notation so untouched keys survive"""
+    update_fields = {}
+    for field, value in changes.items():
+        if isinstance(value, dict):
+            for sub_field, sub_value in value.items():
+                update_fields[f"{field}.{sub_field}"] = sub_value
+        else:
+            update_fields[field] = value
+    return update_fields
+
+_MISSING = object()
+
+def _drop_unchanged_fields(user: Dict[str, Any], update_fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the (dot notation) fields whose value differs from the user document"""
+    changed = {}
+    for path, value in update_fields.items():
+        current = user
+        for key in path.split("."):
+            current = current.get(key, _MISSING) if isinstance(current, dict) else _MISSING
+            if current is _MISSING:
+                break
+        if current != value:
+            changed[path] = value
+    return changed
+
+# What a profile write sends back to the client - enough to re-render the form
+_PATCHED_USER_PROJECTION = {
+    "fullName": 1, "phone": 1, "location": 1, "citizenProfile": 1,
+    "profilePicture": 1, "updatedAt": 1
+}
+
+def _user_oid(user: Dict[str, Any]) -> ObjectId:
+    """_oid is the ObjectId kept by the session lookup - only demo users need parsing"""
+    return user.get("_oid") or ObjectId(user["_id"])
+
+async def _stored_user_fields(user: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """The user's stored top-level fields, without the defaults the session user is padded with"""
+    try:
+        stored = await database.database.users.find_one(
+            {"_id": _user_oid(user), "role": "citizen"},
+            {field: 1 for field in fields}
+        )
+    except Exception as e:
+        logger.warning("⚠️ Stored profile lookup failed: %s", e)
+        stored = None
+    # Nothing to compare against - every submitted field counts as changed
+    return stored or {}
+
+async def _apply_user_patch(user: Dict[str, Any], fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Single $set write shared by PUT /profile and the picture upload
+    
+    Returns the updated (projected) user document, or None if no citizen matched.
+    """
+    updated = await database.database.users.find_one_and_update(
+        {"_id": _user_oid(user), "role": "citizen"},
+        {"$set": fields},
+        projection=_PATCHED_USER_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if updated is not None:
+        updated["_id"] = str(updated["_id"])
+        invalidate_user_cache(user["_id"])
+    return updated
+
 @router.put("/profile")
-async def update_citizen_profile(profile_data: dict, request: Request):
-    """FIXED: Enhanced citizen profile update via API"""
+async def update_citizen_profile(profile_data: CitizenProfileUpdate, request: Request):
+    """FIXED: Enhanced citizen profile update via API (body validated by CitizenProfileUpdate)"""
     try:
-        # ðŸ”¥ GET USER FROM SESSION
+        # 🔥 GET USER FROM SESSION
         user = await get_current_user_from_session(request)
         user_id = user["_id"]
         
-        print(f"ðŸ”„ PROFILE UPDATE: User {user_id}")
-        print(f"ðŸ“„ Update data: {profile_data}")
-        
-        # âœ… ENHANCED VALIDATION
-        errors = []
+        # Only the fields the client actually sent
+        changes = profile_data.model_dump(exclude_none=True)
         
-        # Validate required fields
-        if not profile_data.get("fullName") or len(profile_data["fullName"].strip()) < 2:
-            errors.append("Full name must be at least 2 characters")
+        logger.debug("🔄 PROFILE UPDATE: User %s", user_id)
+        logger.debug("📄 Update data: %s", changes)
         
-        # Validate phone format if provided
-        phone = profile_data.get("phone")
-        if phone:
-            import re
-            if not re.match(r'^\+91-\d{10}$', phone):
-                errors.append("Phone must be in format +91-XXXXXXXXXX")
-        
-        # Validate location data
-        location = profile_data.get("location", {})
-        if location:
-            if location.get("pincode") and not re.match(r'^\d{6}$', location["pincode"]):
-                errors.append("Pincode must be 6 digits")
-            
-            if location.get("state") and len(location["state"].strip()) < 2:
-                errors.append("Please select a valid state")
-                
-            if location.get("city") and len(location["city"].strip()) < 2:
-                errors.append("Please enter a valid city")
-        
-        # Return validation errors if any
-        if errors:
-            print(f"âŒ Validation errors: {errors}")
-            raise HTTPException(status_code=400, detail=f"Validation failed: {'; '.join(errors)}")
-        
-        print("âœ… Validation passed - proceeding with update")
+        # Re-saving an untouched form is common - diff against the stored document, not
+        # the session user: its default location/citizenProfile were never saved
+        stored = await _stored_user_fields(user, list(changes)) if database.database is not None else user
+        update_fields = _drop_unchanged_fields(stored, _profile_update_fields(changes))
+        if not update_fields:
+            logger.debug("⚠️ No changes made (data is the same)")
+            return {
+                "success": True,
+                "message": "No changes",
+                "updatedFields": []
+            }
         
-        # ðŸ”¥ TRY DATABASE UPDATE FIRST
+        # 🔥 TRY DATABASE UPDATE FIRST
         try:
             from ..shared.database import database
             
             if database.database is not None:
-                print("ðŸ“Š Database available - attempting real update")
+                logger.debug("📊 Database available - attempting real update")
                 
                 # Prepare update data with proper structure
-                update_fields = {
-                    "updatedAt": datetime.utcnow()
-                }
-                
-                # Handle basic profile fields
-                if "fullName" in profile_data and profile_data["fullName"]:
-                    update_fields["fullName"] = profile_data["fullName"].strip()
-                
-                if "phone" in profile_data and profile_data["phone"]:
-                    update_fields["phone"] = profile_data["phone"].strip()
-                
-                # Handle location data with dot notation
-                if "location" in profile_data and profile_data["location"]:
-                    location_data = profile_data["location"]
-                    
-                    if location_data.get("state"):
-                        update_fields["location.state"] = location_data["state"].strip()
-                    
-                    if location_data.get("city"):
-                        update_fields["location.city"] = location_data["city"].strip()
-                    
-                    if location_data.get("pincode"):
-                        update_fields["location.pincode"] = location_data["pincode"].strip()
-                    
-                    if location_data.get("address"):
-                        update_fields["location.address"] = location_data["address"].strip()
-                
-                # Handle citizen profile updates
-                if "citizenProfile" in profile_data and profile_data["citizenProfile"]:
-                    citizen_profile = profile_data["citizenProfile"]
-                    
-                    if "languagePreference" in citizen_profile:
-                        valid_languages = ["en", "hi", "te", "ta", "bn"]
-                        if citizen_profile["languagePreference"] in valid_languages:
-                            update_fields["citizenProfile.languagePreference"] = citizen_profile["languagePreference"]
-                    
-                    if "notificationPreferences" in citizen_profile:
-                        valid_notifications = ["push", "sms", "email"]
-                        prefs = citizen_profile["notificationPreferences"]
-                        if isinstance(prefs, list) and all(p in valid_notifications for p in prefs):
-                            update_fields["citizenProfile.notificationPreferences"] = prefs
+                update_fields["updatedAt"] = datetime.now(timezone.utc)
                 
-                print(f"ðŸ’¾ Final update fields: {update_fields}")
+                logger.debug("💾 Final update fields: %s", update_fields)
                 
-                # Perform the database update
-                from bson import ObjectId
-                result = await database.database.users.update_one(
-                    {"_id": ObjectId(user_id), "role": "citizen"},
-                    {"$set": update_fields}
-                )
-                
-                print(f"ðŸ“Š Database update result: matched={result.matched_count}, modified={result.modified_count}")
+                # Perform the database update - the post-update user comes back in the same op
+                updated_user = await _apply_user_patch(user, update_fields)
                 
-                if result.matched_count == 0:
-                    print("âš ï¸ No user found with given ID")
+                if updated_user is None:
+                    logger.warning("⚠️ No user found with given ID")
                     raise HTTPException(status_code=404, detail="User not found")
                 
-                if result.modified_count > 0:
-                    print("âœ… Database update successful")
-                    return {
-                        "success": True,
-                        "message": "Profile updated successfully!",
-                        "updatedFields": list(update_fields.keys())
-                    }
-                else:
-                    print("âš ï¸ No changes made (data might be same)")
-                    return {
-                        "success": True,
-                        "message": "Profile updated (no changes detected)",
-                        "updatedFields": []
-                    }
+                logger.debug("✅ Database update successful")
+                return {
+                    "success": True,
+                    "message": "Profile updated successfully!",
+                    "user": updated_user,
+                    "updatedFields": list(update_fields.keys())
+                }
                 
             else:
-                print("âš ï¸ Database not connected - using demo mode")
+                logger.warning("⚠️ Database not connected - using demo mode")
                 return {
                     "success": True,
                     "message": "Profile updated successfully (demo mode)",
-                    "updatedFields": list(profile_data.keys())
+                    "updatedFields": list(changes.keys())
                 }
                 
+        except HTTPException:
+            raise
         except Exception as db_error:
-            print(f"âš ï¸ Database error: {db_error}")
+            logger.warning("⚠️ Database error: %s", db_error)
             # Continue with demo response instead of failing
             return {
                 "success": True,
                 "message": "Profile updated successfully (demo mode - database unavailable)",
-                "updatedFields": list(profile_data.keys()),
+                "updatedFields": list(changes.keys()),
                 "note": "Changes saved locally, will sync when database is available"
             }
         
     except HTTPException:
-        # Re-raise HTTP exceptions (validation errors)
+        # Re-raise HTTP exceptions (404 from the update)
         raise
     except Exception as e:
-        print(f"âŒ Unexpected profile update error: {e}")
-        import traceback
-        print(f"ðŸ” Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Unexpected profile update error")
         raise HTTPException(status_code=500, detail=f"Profile update failed: {str(e)}")
     
-@router.post("/profile/image")
-async def upload_profile_image(profileImage: UploadFile = File(...), request: Request = None):
-    """FIXED: Upload and update citizen profile picture"""
+# Profile pictures are read in chunks and rejected as soon as they pass the cap
+_MAX_PROFILE_IMAGE_BYTES = 5 * 1024 * 1024
+_UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# Face-cropped avatar, derived by Cloudinary in the background after upload
+_PROFILE_IMAGE_TRANSFORM = {
+    "width": 400,
+    "height": 400,
+    "crop": "fill",
+    "gravity": "face",
+    "quality": "auto"
+}
+
+def _sniff_image_type(head: bytes) -> Optional[str]:
+    """Identify JPEG/PNG/GIF/WebP from the file signature - content_type is client supplied"""
+    if head[:3] == b'\xff\xd8\xff':
+        return "image/jpeg"
+    if head[:8] == b'\x89PNG\r\n\x1a\n':
+        return "image/png"
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return "image/gif"
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return "image/webp"
+    return None
+
+@router.post("/profile/image", response_model=None, response_class=_UTCJSONResponse)
+async def upload_profile_image(
+    profileImage: UploadFile = File(...),
+    profileData: Optional[str] = Form(None),
+    request: Request = None
+):
+    """FIXED: Upload and update citizen profile picture (optionally with a JSON profileData form field, saved in the same write)"""
     try:
-        # ðŸ”¥ GET USER FROM SESSION
+        # 🔥 GET USER FROM SESSION
         user = await get_current_user_from_session(request)
         user_id = user["_id"]
         
-        print(f"ðŸ“¸ PROFILE IMAGE UPLOAD: User {user_id}")
-        print(f"ðŸ“„ File: {profileImage.filename}, Type: {profileImage.content_type}")
+        # Profile edits sent alongside the picture ride on the same update
+        profile_fields = {}
+        if profileData:
+            try:
+                changes = CitizenProfileUpdate.model_validate_json(profileData).model_dump(exclude_none=True)
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+            profile_fields = _profile_update_fields(changes)
+        
+        logger.debug("📸 PROFILE IMAGE UPLOAD: User %s", user_id)
+        logger.debug("📄 File: %s, Type: %s", profileImage.filename, profileImage.content_type)
+        
+        # ✅ ENHANCED FILE VALIDATION
+        # Validate file size (5MB limit) - trust a declared length first, then count while reading
+        content_length = request.headers.get("content-length") if request else None
+        if content_length and content_length.isdigit() and int(content_length) > _MAX_PROFILE_IMAGE_BYTES + _UPLOAD_CHUNK_BYTES:
+            raise HTTPException(status_code=400, detail="File too large. Maximum size is 5MB")
+        
+        content = bytearray()
+        while True:
+            chunk = await profileImage.read(_UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            content.extend(chunk)
+            if len(content) > _MAX_PROFILE_IMAGE_BYTES:
+                raise HTTPException(status_code=400, detail="File too large. Maximum size is 5MB")
+        file_size = len(content)
         
-        # âœ… ENHANCED FILE VALIDATION
-        # Validate file type
-        allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/gif", "image/webp"]
-        if profileImage.content_type not in allowed_types:
+        # Validate file type from the bytes themselves
+        image_type = _sniff_image_type(content[:12])
+        if image_type is None:
             raise HTTPException(
                 status_code=400, 
                 detail="Invalid file type. Only JPEG, PNG, GIF, and WebP images are allowed"
             )
         
-        # Validate file size (5MB limit)
-        file_size = 0
-        content = await profileImage.read()
-        file_size = len(content)
-        await profileImage.seek(0)  # Reset file pointer
-        
-        if file_size > 5 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="File too large. Maximum size is 5MB")
-        
-        print(f"âœ… File validation passed: {file_size} bytes")
+        logger.debug("✅ File validation passed: %s, %s bytes", image_type, file_size)
         
-        # ðŸ”¥ TRY CLOUDINARY UPLOAD (IF CONFIGURED)
+        # 🔥 TRY CLOUDINARY UPLOAD (IF CONFIGURED)
         try:
             from ..shared.config import settings
             
             if (hasattr(settings, 'cloudinary_cloud_name') and 
                 settings.cloudinary_cloud_name):
                 
-                print("â˜ï¸ Cloudinary configured - attempting upload")
+                logger.debug("☁️ Cloudinary configured - attempting upload")
                 
                 import cloudinary
                 import cloudinary.uploader
+                import cloudinary.utils
                 
                 cloudinary.config(
                     cloud_name=settings.cloudinary_cloud_name,
@@ -612,82 +704,85 @@ async def upload_profile_image(profileImage: UploadFile = File(...), request: Re
                     api_secret=settings.cloudinary_api_secret
                 )
                 
-                # Upload to Cloudinary
-                upload_result = cloudinary.uploader.upload(
-                    content,
+                # Upload to Cloudinary - the SDK is blocking, keep it off the event loop
+                upload_result = await asyncio.to_thread(
+                    cloudinary.uploader.upload,
+                    io.BytesIO(content),
                     folder="meri_dharani/profiles",
                     public_id=f"profile_{user_id}",
-                    transformation={
-                        "width": 400, 
-                        "height": 400, 
-                        "crop": "fill", 
-                        "gravity": "face",
-                        "quality": "auto"
-                    }
+                    eager=[_PROFILE_IMAGE_TRANSFORM],
+                    eager_async=True,
+                    eager_notification_url=settings.cloudinary_webhook_url
                 )
                 
-                image_url = upload_result["secure_url"]
-                print(f"âœ… Image uploaded to Cloudinary: {image_url}")
+                # The crop is still being derived - hand out its URL now, Cloudinary
+                # serves it as soon as the eager transform lands
+                original_url = upload_result["secure_url"]
+                image_url, _ = cloudinary.utils.cloudinary_url(
+                    upload_result["public_id"],
+                    secure=True,
+                    version=upload_result.get("version"),
+                    format=upload_result.get("format"),
+                    **_PROFILE_IMAGE_TRANSFORM
+                )
+                logger.debug("✅ Image uploaded to Cloudinary: %s (avatar %s)", original_url, image_url)
                 
-                # Update user profile with image URL
+                # Update user profile with image URL (plus any profile edits) in one write
                 try:
-                    from ..shared.database import database
-                    from bson import ObjectId
-                    
                     if database.database is not None:
-                        result = await database.database.users.update_one(
-                            {"_id": ObjectId(user_id), "role": "citizen"},
-                            {"$set": {
-                                "profilePicture": image_url,
-                                "updatedAt": datetime.utcnow()
-                            }}
-                        )
+                        updated_user = await _apply_user_patch(user, {
+                            **profile_fields,
+                            "profilePicture": image_url,
+                            "updatedAt": datetime.now(timezone.utc)
+                        })
                         
-                        if result.modified_count > 0:
-                            print("âœ… Profile picture URL saved to database")
+                        if updated_user is not None:
+                            logger.debug("✅ Profile picture URL saved to database")
                         else:
-                            print("âš ï¸ Database update failed, but image uploaded")
+                            logger.warning("⚠️ Database update failed, but image uploaded")
                 
                 except Exception as db_error:
-                    print(f"âš ï¸ Database save failed: {db_error}")
+                    logger.warning("⚠️ Database save failed: %s", db_error)
                     # Continue anyway since image was uploaded
                 
-                return {
+                return _UTCJSONResponse({
                     "success": True,
                     "message": "Profile picture updated successfully!",
                     "imageUrl": image_url,
-                    "uploadedAt": datetime.utcnow().isoformat()
-                }
+                    "originalUrl": original_url,
+                    "updatedFields": list(profile_fields.keys()),
+                    "uploadedAt": datetime.now(timezone.utc)
+                })
                 
             else:
-                print("âš ï¸ Cloudinary not configured - using demo mode")
+                logger.warning("⚠️ Cloudinary not configured - using demo mode")
                 
         except Exception as upload_error:
-            print(f"âš ï¸ Image upload failed: {upload_error}")
+            logger.warning("⚠️ Image upload failed: %s", upload_error)
         
-        # ðŸ”¥ FALLBACK: DEMO MODE SUCCESS
+        # 🔥 FALLBACK: DEMO MODE SUCCESS
         demo_image_url = f"https://via.placeholder.com/400x400/22c55e/ffffff?text={user_id[:2].upper()}"
         
-        return {
+        return _UTCJSONResponse({
             "success": True,
             "message": "Profile picture updated successfully! (Demo mode)",
             "imageUrl": demo_image_url,
-            "uploadedAt": datetime.utcnow().isoformat(),
+            "uploadedAt": datetime.now(timezone.utc),
             "note": "Image upload simulated - configure Cloudinary for real uploads"
-        }
+        })
         
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        print(f"âŒ Unexpected image upload error: {e}")
+        logger.exception("❌ Unexpected image upload error")
         raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
 
-@router.get("/stats")
+@router.get("/stats", response_model=None, response_class=ORJSONResponse)
 async def get_citizen_stats(request: Request):
     """Get citizen statistics via API - Now uses session"""
     try:
-        # ðŸ”¥ GET USER FROM SESSION
+        # 🔥 GET USER FROM SESSION
         user = await get_current_user_from_session(request)
         
         stats = {
@@ -702,171 +797,195 @@ async def get_citizen_stats(request: Request):
             "wasteRecycled": 45.2  # TODO: Calculate from completed reports
         }
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "stats": stats
-        }
+        })
         
     except Exception as e:
-        print(f"âŒ API stats error: {e}")
+        logger.exception("❌ API stats error")
         raise HTTPException(status_code=500, detail="Failed to get statistics")
 
-@router.get("/api/activity-summary")
+@lru_cache(maxsize=1024)
+def _activity_summary_bytes(total_reports: int, total_points: int, badge_count: int) -> bytes:
+    """Serialized activity summary - only the all-time numbers vary per citizen"""
+    activity_summary = {
+        "thisWeek": {
+            "reportsSubmitted": 2,
+            "pointsEarned": 50,
+            "badgesUnlocked": 1,
+            "hoursContributed": 1.5
+        },
+        "thisMonth": {
+            "reportsSubmitted": 8,
+            "pointsEarned": 200,
+            "badgesUnlocked": 2,
+            "hoursContributed": 6.0
+        },
+        "allTime": {
+            "reportsSubmitted": total_reports,
+            "pointsEarned": total_points,
+            "badgesUnlocked": badge_count,
+            "hoursContributed": 25.5
+        },
+        "achievements": [
+            {
+                "title": "First Report",
+                "description": "Submitted your first waste report",
+                "icon": "🎯",
+                "unlockedAt": "2025-01-15"
+            },
+            {
+                "title": "Weekend Warrior", 
+                "description": "Reported waste on weekend",
+                "icon": "⚡",
+                "unlockedAt": "2025-01-20"
+            }
+        ],
+        "recentActivity": [
+            {
+                "type": "report_submitted",
+                "title": "Waste Report Submitted",
+                "description": "Plastic waste reported at Park Street",
+                "timestamp": "2025-01-20T10:30:00Z",
+                "points": 25
+            },
+            {
+                "type": "badge_earned",
+                "title": "Badge Unlocked",
+                "description": "Earned 'Sharp Eye' badge",
+                "timestamp": "2025-01-19T15:45:00Z",
+                "points": 50
+            }
+        ]
+    }
+    
+    return orjson.dumps({
+        "success": True,
+        "activitySummary": activity_summary
+    })
+
+@router.get("/api/activity-summary", response_model=None, response_class=ORJSONResponse)
 async def get_citizen_activity_summary(request: Request):
     """Get comprehensive activity summary for profile - Now uses session"""
     try:
-        # ðŸ”¥ GET USER FROM SESSION
+        # 🔥 GET USER FROM SESSION
         user = await get_current_user_from_session(request)
-        user_id = user["_id"]
+        citizen_profile = user["citizenProfile"]
         
-        # Calculate activity metrics
-        activity_summary = {
-            "thisWeek": {
-                "reportsSubmitted": 2,
-                "pointsEarned": 50,
-                "badgesUnlocked": 1,
-                "hoursContributed": 1.5
-            },
-            "thisMonth": {
-                "reportsSubmitted": 8,
-                "pointsEarned": 200,
-                "badgesUnlocked": 2,
-                "hoursContributed": 6.0
-            },
-            "allTime": {
-                "reportsSubmitted": user["citizenProfile"]["totalReports"],
-                "pointsEarned": user["citizenProfile"]["totalPoints"],
-                "badgesUnlocked": len(user["citizenProfile"].get("badges", [])),
-                "hoursContributed": 25.5
-            },
-            "achievements": [
-                {
-                    "title": "First Report",
-                    "description": "Submitted your first waste report",
-                    "icon": "ðŸŽ¯",
-                    "unlockedAt": "2025-01-15"
-                },
-                {
-                    "title": "Weekend Warrior", 
-                    "description": "Reported waste on weekend",
-                    "icon": "âš¡",
-                    "unlockedAt": "2025-01-20"
-                }
-            ],
-            "recentActivity": [
-                {
-                    "type": "report_submitted",
-                    "title": "Waste Report Submitted",
-                    "description": "Plastic waste reported at Park Street",
-                    "timestamp": "2025-01-20T10:30:00Z",
-                    "points": 25
-                },
-                {
-                    "type": "badge_earned",
-                    "title": "Badge Unlocked",
-                    "description": "Earned 'Sharp Eye' badge",
-                    "timestamp": "2025-01-19T15:45:00Z",
-                    "points": 50
-                }
-            ]
-        }
-        
-        return {
-            "success": True,
-            "activitySummary": activity_summary
-        }
+        return Response(
+            _activity_summary_bytes(
+                citizen_profile["totalReports"],
+                citizen_profile["totalPoints"],
+                len(citizen_profile.get("badges", []))
+            ),
+            media_type="application/json"
+        )
         
     except Exception as e:
-        print(f"âŒ Activity summary error: {e}")
+        logger.exception("❌ Activity summary error")
         raise HTTPException(status_code=500, detail="Failed to get activity summary")
 
-@router.get("/api/leaderboard")
+# Serialized leaderboard pages by (period, limit, leaderboard refresh generation):
+# a refresh moves readers to a new key and the stale pages age out
+_leaderboard_payloads = TTLCache(maxsize=64, ttl=300)
+
+@router.get("/api/leaderboard", response_model=None, response_class=ORJSONResponse)
 async def get_citizen_leaderboard(period: str = "weekly", limit: int = 10):
     """Get leaderboard data for citizens"""
     try:
-        print(f"ðŸ† Getting {period} leaderboard (top {limit})")
-        
-        # Demo leaderboard data
-        leaderboard = [
-            {
-                "rank": 1,
-                "userId": "user_001",
-                "fullName": "Priya Sharma",
-                "points": 450,
-                "reports": 18,
-                "level": "eco_champion",
-                "avatar": "https://via.placeholder.com/40x40/22c55e/ffffff?text=PS"
-            },
-            {
-                "rank": 2,
-                "userId": "user_002", 
-                "fullName": "Rajesh Kumar",
-                "points": 420,
-                "reports": 16,
-                "level": "waste_warrior",
-                "avatar": "https://via.placeholder.com/40x40/3b82f6/ffffff?text=RK"
-            },
-            {
-                "rank": 3,
-                "userId": "demo_citizen_123",
-                "fullName": "Demo EcoWarrior",
-                "points": 150,
-                "reports": 3,
-                "level": "eco_warrior",
-                "avatar": "https://via.placeholder.com/40x40/f59e0b/ffffff?text=DE"
-            }
-        ]
+        logger.debug("🏆 Getting %s leaderboard (top %s)", period, limit)
+        
+        limit = max(1, min(limit, 100))
+        key = (period, limit, citizen_service.leaderboard_generation)
+        payload = _leaderboard_payloads.get(key)
+        if payload is None:
+            leaderboard = await citizen_service.get_citizen_leaderboard(period, limit)
+            payload = _leaderboard_payloads[key] = orjson.dumps({
+                "success": True,
+                "leaderboard": leaderboard,
+                "period": period
+            })
         
-        return {
-            "success": True,
-            "leaderboard": leaderboard,
-            "period": period,
-            "userRank": 3,
-            "totalParticipants": 127
-        }
+        return Response(payload, media_type="application/json")
         
     except Exception as e:
-        print(f"âŒ Leaderboard error: {e}")
+        logger.exception("❌ Leaderboard error")
         raise HTTPException(status_code=500, detail="Failed to get leaderboard")
 
-@router.get("/api/reports")
-async def get_citizen_reports(page: int = 1, limit: int = 10, status: str = None, request: Request = None):
-    """Get citizen's waste reports with pagination - Now uses session"""
+def _encode_reports_cursor(after: tuple) -> str:
+    """Opaque next-page cursor from the stored (created_at, _id) of a page's last report"""
+    created_at, last_id = after
+    raw = f"{created_at.isoformat()}|{last_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_reports_cursor(cursor: str) -> tuple:
+    """(created_at, ObjectId) keyset position from a cursor - 400 if it was tampered with"""
     try:
-        # ðŸ”¥ GET USER FROM SESSION
+        created_at, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), ObjectId(last_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/api/reports", response_model=None, response_class=ORJSONResponse)
+async def get_citizen_reports(
+    limit: int = 10,
+    status: str = None,
+    cursor: Optional[str] = None,
+    page: Optional[int] = None,
+    request: Request = None
+):
+    """Get citizen's waste reports with keyset pagination (pass back nextCursor) - Now uses session
+    
+    page is still honoured for old callers (skip based) when no cursor is sent.
+    """
+    try:
+        # 🔥 GET USER FROM SESSION
         user = await get_current_user_from_session(request)
         user_id = user["_id"]
         
-        print(f"ðŸ“‹ Getting reports for user: {user_id} (page: {page}, limit: {limit}, status: {status})")
+        limit = max(1, min(limit, 50))
+        after = _decode_reports_cursor(cursor) if cursor else None
+        if page is not None and page < 1:
+            raise HTTPException(status_code=400, detail="page must be 1 or greater")
+        skip = (page - 1) * limit if page and after is None else 0
         
-        # Get reports from service
-        reports = await citizen_service.get_citizen_requests(user_id, limit)
+        logger.debug("📋 Getting reports for user: %s (cursor: %s, page: %s, limit: %s, status: %s)", user_id, cursor, page, limit, status)
         
-        return {
+        # Get reports and the (cached) total from service
+        (reports, next_after), total = await asyncio.gather(
+            citizen_service.get_citizen_requests(user_id, limit, after=after, status=status, skip=skip),
+            citizen_service.count_citizen_requests(user_id, status)
+        )
+        
+        return ORJSONResponse({
             "success": True,
             "reports": reports,
             "pagination": {
-                "page": page,
                 "limit": limit,
-                "total": len(reports),
-                "pages": 1
+                "total": total,
+                "pages": -(-total // limit),
+                "nextCursor": _encode_reports_cursor(next_after) if next_after else None
             }
-        }
+        })
+        
+    except HTTPException:
+        raise
         
     except Exception as e:
-        print(f"âŒ Reports error: {e}")
+        logger.exception("❌ Reports error")
         raise HTTPException(status_code=500, detail="Failed to get reports")
 
 @router.post("/api/reports")
 async def create_waste_report(report_data: dict, request: Request):
     """Create new waste report - Now uses session"""
     try:
-        # ðŸ”¥ GET USER FROM SESSION
+        # 🔥 GET USER FROM SESSION
         user = await get_current_user_from_session(request)
         user_id = user["_id"]
         
-        print(f"ðŸ“ Creating waste report for user: {user_id}")
-        print(f"ðŸ“„ Report data: {report_data}")
+        logger.debug("📝 Creating waste report for user: %s", user_id)
+        logger.debug("📄 Report data: %s", report_data)
         
         # Create report via service
         report_id = await citizen_service.create_service_request(user_id, report_data)
@@ -878,14 +997,15 @@ async def create_waste_report(report_data: dict, request: Request):
         }
         
     except Exception as e:
-        print(f"âŒ Report creation error: {e}")
+        logger.exception("❌ Report creation error")
         raise HTTPException(status_code=500, detail="Failed to create report")
 
 @router.get("/requests")
-async def citizen_requests_redirect(request: Request):
-    """Redirect /citizen/requests to /citizen/my-requests - UPDATED"""
-    from fastapi.responses import RedirectResponse
-    return RedirectResponse(url="/citizen/my-requests", status_code=302)
+async def citizen_requests_redirect():
+    """Permanently redirect /citizen/requests to /citizen/my-requests - browsers cache the 308"""
+    # A fresh response per call: middleware appends headers (session cookie)
+    # to the response's header list in place, so one shared instance would leak them
+    return RedirectResponse(url="/citizen/my-requests", status_code=308)
 
 @router.get("/request/{request_id}")
 async def request_detail_page(request_id: str, request: Request):
@@ -900,42 +1020,39 @@ async def request_detail_page(request_id: str, request: Request):
             from ..shared.database import database
             
             # 🔥 FIX: Same pattern as above
-            if (hasattr(database, 'database') and 
-                database.database is not None and 
-                hasattr(database, 'is_connected') and 
-                database.is_connected):
+            if database.ready:
                 
-                request_detail = await database.database.requests.find_one({
+                request_detail = await database.requests.find_one({
                     "request_id": request_id,
                     "user_id": user_id  # Security: user can only see their own requests
                 })
                 
                 if request_detail:
                     request_detail["_id"] = str(request_detail["_id"])
-                    print(f"✅ Found request details for {request_id}")
+                    logger.debug("✅ Found request details for %s", request_id)
                 else:
-                    print(f"❌ Request {request_id} not found for user {user_id}")
+                    logger.warning("❌ Request %s not found for user %s", request_id, user_id)
             else:
-                print("⚠️ No database - using demo request detail")
+                logger.warning("⚠️ No database - using demo request detail")
                 request_detail = {
                     "_id": "demo_detail",
                     "request_id": request_id,
                     "user_description": "Demo request detail",
                     "status": "completed",
-                    "created_at": datetime.utcnow(),
+                    "created_at": datetime.now(timezone.utc),
                     "content": {
                         "title": "Demo Request",
                         "category": "plastic"
                     }
                 }
         except Exception as e:
-            print(f"❌ Request detail query failed: {e}")
+            logger.exception("❌ Request detail query failed")
             request_detail = None
         
         if not request_detail:
             raise HTTPException(status_code=404, detail="Request not found")
         
-        return templates.TemplateResponse("citizen/request_detail.html", {
+        return _render("citizen/request_detail.html", {
             "request": request,
             "user": user,
             "request_detail": request_detail,
@@ -946,28 +1063,33 @@ async def request_detail_page(request_id: str, request: Request):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Request detail error: {e}")
+        logger.exception("❌ Request detail error")
         raise HTTPException(status_code=500, detail="Failed to load request details")
 
 # ===================
 # HEALTH CHECK
 # ===================
 
-@router.get("/health")
+# Everything but the timestamp is fixed - serialized once, the handler only appends the time
+_HEALTH_PREFIX = orjson.dumps({
+    "success": True,
+    "service": "citizen",
+    "message": "EcoWarrior service is healthy with session management",
+    "features": [
+        "session_management",
+        "profile_management",
+        "image_upload", 
+        "preferences_update",
+        "activity_tracking",
+        "leaderboard",
+        "reports_api"
+    ]
+})[:-1] + b',"timestamp":'
+
+@router.get("/health", response_model=None, response_class=Response)
 async def citizen_health_check():
     """Citizen service health check"""
-    return {
-        "success": True,
-        "service": "citizen",
-        "message": "EcoWarrior service is healthy with session management",
-        "features": [
-            "session_management",
-            "profile_management",
-            "image_upload", 
-            "preferences_update",
-            "activity_tracking",
-            "leaderboard",
-            "reports_api"
-        ],
-        "timestamp": datetime.utcnow().isoformat()
-    }
\ No newline at end of file
+    return Response(
+        _HEALTH_PREFIX + orjson.dumps(datetime.now(timezone.utc), option=orjson.OPT_UTC_Z) + b"}",
+        media_type="application/json"
+    )
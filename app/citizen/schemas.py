@@ -0,0 +1,32 @@
+# app/citizen/schemas.py - EcoWarrior Data Validation Schemas
+from typing import List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+# ===================
+# PROFILE SCHEMAS
+# ===================
+
+class CitizenLocationUpdate(BaseModel):
+    """Location part of a profile update - every field optional"""
+    model_config = ConfigDict(str_strip_whitespace=True, extra="ignore")
+
+    state: Optional[str] = Field(None, min_length=2, description="State name")
+    city: Optional[str] = Field(None, min_length=2, description="City name")
+    pincode: Optional[str] = Field(None, pattern=r'^\d{6}$', description="6 digit pincode")
+    address: Optional[str] = Field(None, description="Street address")
+
+class CitizenPreferencesUpdate(BaseModel):
+    """citizenProfile preferences a citizen may change themselves"""
+    model_config = ConfigDict(extra="ignore")
+
+    languagePreference: Optional[Literal["en", "hi", "te", "ta", "bn"]] = None
+    notificationPreferences: Optional[List[Literal["push", "sms", "email"]]] = None
+
+class CitizenProfileUpdate(BaseModel):
+    """Body of PUT /citizen/profile"""
+    model_config = ConfigDict(str_strip_whitespace=True, extra="ignore")
+
+    fullName: str = Field(..., min_length=2, description="Full name")
+    phone: Optional[str] = Field(None, pattern=r'^\+91-\d{10}$', description="Phone as +91-XXXXXXXXXX")
+    location: Optional[CitizenLocationUpdate] = None
+    citizenProfile: Optional[CitizenPreferencesUpdate] = None
@@ -1,87 +1,448 @@
 # app/citizen/services.py - Enhanced EcoWarrior Business Logic with Profile Updates
-from datetime import datetime
-from typing import Optional, Dict, Any, List
+import asyncio
+import copy
+import logging
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Tuple
 from bson import ObjectId
+from pymongo import ReturnDocument, WriteConcern
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from fastapi import HTTPException
 
-from ..shared.database import get_database
+from ..shared.database import CASE_INSENSITIVE_COLLATION, database, get_database
+from ..shared.user_cache import get_user_cache, invalidate_user_cache
+
+logger = logging.getLogger(__name__)
+
+# count_documents results per user id ({status or None: count}); dropped with
+# the user's other cached data when a new request is stored
+_request_count_cache = get_user_cache("citizen_request_counts", ttl=30)
+
+# get_citizen_by_id results per user id ({projection fields: user}); every
+# CitizenService write to a user drops that user's entry
+_citizen_cache = get_user_cache("citizen_by_id", ttl=30)
+
+# Users whose badges were checked since their counters last changed (user id -> True);
+# any write to the user drops the entry, so the next check re-evaluates
+_badge_check_cache = get_user_cache("citizen_badge_checks", ttl=300)
+
+# Monthly stats + environmental impact per user id, from one aggregation over the
+# user's requests; dropped with the user's other cached data when a new request is stored
+_activity_cache = get_user_cache("citizen_activity", ttl=300)
+
+# Allowed citizenProfile preference values (same lists as CitizenPreferencesUpdate)
+_VALID_LANGUAGES = frozenset({"en", "hi", "te", "ta", "bn"})
+_VALID_NOTIFICATIONS = frozenset({"push", "sms", "email"})
+# Whole-value patterns - always used with fullmatch (match + '$' lets a trailing newline through)
+_PHONE_RE = re.compile(r'\+91-\d{10}')
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_PINCODE_RE = re.compile(r'\d{6}')
+
+# Fields citizen pages and APIs read - password hashes, tokens and audit
+# history never leave Mongo
+_CITIZEN_PROJECTION = {
+    "fullName": 1, "email": 1, "phone": 1, "role": 1, "isActive": 1,
+    "isVerified": 1, "emailVerified": 1, "phoneVerified": 1, "reputation": 1,
+    "citizenProfile": 1, "location": 1, "profilePicture": 1,
+    "createdAt": 1, "updatedAt": 1
+}
+
+# Just the numbers behind get_citizen_stats
+_CITIZEN_STATS_PROJECTION = {
+    "citizenProfile.totalReports": 1, "citizenProfile.totalPoints": 1,
+    "citizenProfile.level": 1, "citizenProfile.badges": 1, "reputation": 1
+}
+
+# Request list rows (reports API) - the full AI payload stays on the detail page
+_REQUEST_LIST_PROJECTION = {
+    "request_id": 1, "status": 1, "user_description": 1, "content": 1,
+    "created_at": 1, "updated_at": 1, "environmental_impact": 1,
+    "ai_analysis.waste_type": 1, "ai_analysis.priority": 1,
+    "cloudinary_urls": 1, "location.address": 1
+}
+
+# Demo/default citizen data - built once, copied into each user that needs it
+_DEMO_CITIZEN_TEMPLATE = MappingProxyType({
+    "_id": "demo_citizen_123",
+    "fullName": "Demo EcoWarrior",
+    "email": "demo@example.com",
+    "phone": "+91-9876543210",
+    "role": "citizen",
+    "isActive": True,
+    "isVerified": True,
+    "emailVerified": True,
+    "phoneVerified": True,
+    "reputation": 4.8,
+    "profilePicture": "https://via.placeholder.com/400x400/22c55e/ffffff?text=Demo"
+})
+
+_DEFAULT_CITIZEN_PROFILE = MappingProxyType({
+    "totalReports": 3,
+    "totalPoints": 150,
+    "level": "eco_warrior",
+    "badges": ["first_report", "weekend_warrior"],
+    "languagePreference": "en",
+    "notificationPreferences": ["push", "sms"]
+})
+
+_DEFAULT_LOCATION = MappingProxyType({
+    "state": "Andhra Pradesh",
+    "city": "Yanamalakuduru", 
+    "pincode": "521456",
+    "address": "123 Green Street, Yanamalakuduru, AP"
+})
+
+# Immutable top-level defaults, applied with setdefault
+_CITIZEN_FIELD_DEFAULTS = MappingProxyType({
+    "reputation": 5.0,
+    "isActive": True,
+    "isVerified": True,
+    "emailVerified": True,
+    "phoneVerified": True,
+    "phone": "+91-9876543210",
+    "profilePicture": None
+})
+
+_LEVEL_THRESHOLDS = MappingProxyType({
+    "eco_rookie": {"min": 0, "max": 100, "next": "eco_warrior"},
+    "eco_warrior": {"min": 100, "max": 300, "next": "waste_warrior"},
+    "waste_warrior": {"min": 300, "max": 600, "next": "green_guardian"},
+    "green_guardian": {"min": 600, "max": 1000, "next": "eco_champion"},
+    "eco_champion": {"min": 1000, "max": float('inf'), "next": "max_level"}
+})
+
+# calculate_level_from_points as an aggregation expression, so a reward can
+# recompute the level inside its own update
+_LEVEL_FROM_POINTS_EXPR = {
+    "$switch": {
+        "branches": [
+            {"case": {"$lt": ["$citizenProfile.totalPoints", info["max"]]}, "then": level}
+            for level, info in _LEVEL_THRESHOLDS.items()
+            if info["max"] != float('inf')
+        ],
+        "default": "eco_champion"
+    }
+}
+
+# Fields counted by calculate_profile_completeness, as pre-split key paths
+_REQUIRED_PROFILE_FIELDS = (
+    ("fullName",), ("email",), ("phone",),
+    ("location", "state"), ("location", "city"), ("location", "pincode"), ("location", "address")
+)
+
+_MISSING = object()
+
+@lru_cache(maxsize=1024)
+def _parse_oid(user_id: str) -> Optional[ObjectId]:
+    """Parsed user id, or None for demo/malformed ids (which never match a document)"""
+    if not user_id or user_id.startswith("demo") or not ObjectId.is_valid(user_id):
+        return None
+    return ObjectId(user_id)
+
+def _to_oid(user_id: Any) -> Optional[ObjectId]:
+    """Accept a str or an already parsed ObjectId at the service boundary"""
+    if isinstance(user_id, ObjectId):
+        return user_id
+    return _parse_oid(str(user_id))
+
+def _lookup(data: Dict[str, Any], path: tuple) -> Any:
+    """Nested dict value at path, or _MISSING"""
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return _MISSING
+        data = data[key]
+    return data
+
+def _strip(value: Any) -> Any:
+    return value.strip() if isinstance(value, str) else value
+
+# (source path in update_data, $set path, clean, validate, validation error)
+_PROFILE_FIELD_MAP = (
+    (("fullName",), "fullName", _strip, lambda v: len(v) >= 2, "Full name must be at least 2 characters"),
+    (("phone",), "phone", _strip, lambda v: bool(_PHONE_RE.fullmatch(v)), "Phone must be in format +91-XXXXXXXXXX"),
+    (("location", "state"), "location.state", _strip, None, None),
+    (("location", "city"), "location.city", _strip, None, None),
+    (("location", "pincode"), "location.pincode", _strip, lambda v: bool(_PINCODE_RE.fullmatch(v)), "Pincode must be 6 digits"),
+    (("location", "address"), "location.address", _strip, None, None),
+    (("citizenProfile", "languagePreference"), "citizenProfile.languagePreference", None,
+     lambda v: v in _VALID_LANGUAGES, "Invalid language preference"),
+    (("citizenProfile", "notificationPreferences"), "citizenProfile.notificationPreferences", None,
+     lambda v: isinstance(v, list) and _VALID_NOTIFICATIONS.issuperset(v), "Invalid notification preferences"),
+    (("profilePicture",), "profilePicture", None, None, None),
+    (("isActive",), "isActive", bool, None, None),
+    (("deactivatedAt",), "deactivatedAt", None, None, None),
+    (("deactivationReason",), "deactivationReason", None, None, None),
+)
+
+# Points transactions are append-only history nobody reads on the request path -
+# buffered and written with insert_many every _TX_FLUSH_SECONDS or _TX_BATCH_SIZE entries
+_TX_BATCH_SIZE = 50
+_TX_FLUSH_SECONDS = 1.0
+
+# Gamification counters, badges and the points history are acknowledged by the
+# primary alone (w=1, no journal wait): losing one on a failover costs a few
+# points, not user data. Profile edits keep the client's default write concern.
+_FAST_WRITE_CONCERN = WriteConcern(w=1, j=False)
+
+# Reports a citizen is nudged towards each month (monthlyStats.goalProgress)
+_MONTHLY_REPORT_GOAL = 10
+
+_EMPTY_MONTHLY_STATS = MappingProxyType({
+    "reportsThisMonth": 0, "pointsThisMonth": 0, "rankThisMonth": 0, "goalProgress": 0, "streakDays": 0
+})
+_EMPTY_IMPACT = MappingProxyType({"co2Saved": 0, "wasteRecycled": 0, "treesEquivalent": 0, "waterSaved": 0})
+
+# Per-request environmental_impact fields summed into the profile's environmentalImpact
+_IMPACT_SUMS = {
+    "co2Saved": {"$sum": "$environmental_impact.co2_saved_kg"},
+    "wasteRecycled": {"$sum": "$environmental_impact.waste_collected_kg"},
+    "treesEquivalent": {"$sum": "$environmental_impact.trees_equivalent"},
+    "waterSaved": {"$sum": "$environmental_impact.water_saved_liters"},
+}
+
+# Every leaderboard / rank / search read is over active citizens - one shape for
+# the filter (the citizen_pts_desc / citizen_reports_desc partial indexes use it too)
+_CITIZEN_BASE_FILTER = MappingProxyType({"role": "citizen", "isActive": True})
+
+# Badges that come with reaching a level - awarded by the level-up write itself
+# (increment_citizen_points / apply_reward), never by check_and_award_badges
+_LEVEL_BADGES = MappingProxyType({"eco_champion": "eco_champion"})
+_LEVEL_BADGES_EXPR = {"$switch": {
+    "branches": [
+        {"case": {"$eq": ["$citizenProfile.level", level]}, "then": [badge_id]}
+        for level, badge_id in _LEVEL_BADGES.items()
+    ],
+    "default": []
+}}
+
+# Badge thresholds: (badge id, minimum citizenProfile counter). Evaluated server-side
+# by check_and_award_badges' update and again on its pre-image to tell which were new.
+_REPORT_BADGES = (("first_report", 1), ("reporter_5", 5), ("reporter_10", 10), ("community_leader", 25))
+_POINT_BADGES = (("point_hunter_100", 100), ("point_hunter_500", 500))
+_SHARP_EYE_REPUTATION = 4.5
+
+# Every badge the document currently qualifies for, as an aggregation expression
+_EARNED_BADGES_EXPR = {"$concatArrays": [
+    *({"$cond": [{"$gte": ["$citizenProfile.totalReports", minimum]}, [badge_id], []]}
+      for badge_id, minimum in _REPORT_BADGES),
+    *({"$cond": [{"$gte": ["$citizenProfile.totalPoints", minimum]}, [badge_id], []]}
+      for badge_id, minimum in _POINT_BADGES),
+    ["weekend_warrior"],  # TODO: Check if reported on weekend
+    {"$cond": [{"$gte": ["$reputation", _SHARP_EYE_REPUTATION]}, ["sharp_eye"], []]},
+]}
+_BADGE_FIELDS_PROJECTION = {
+    "citizenProfile.badges": 1, "citizenProfile.totalReports": 1, "citizenProfile.totalPoints": 1, "reputation": 1
+}
+
+def _earned_badges(user: Dict[str, Any]) -> List[str]:
+    """Badges a user document qualifies for - the Python twin of _EARNED_BADGES_EXPR"""
+    profile = user.get("citizenProfile") or {}
+    reports = profile.get("totalReports") or 0
+    points = profile.get("totalPoints") or 0
+    
+    earned = [badge_id for badge_id, minimum in _REPORT_BADGES if reports >= minimum]
+    earned += [badge_id for badge_id, minimum in _POINT_BADGES if points >= minimum]
+    earned.append("weekend_warrior")
+    if (user.get("reputation") or 0) >= _SHARP_EYE_REPUTATION:
+        earned.append("sharp_eye")
+    return earned
+
+def _badge_award_stages(badges: Any, awarded_at: datetime) -> List[Dict[str, Any]]:
+    """Update-pipeline stages appending the not-yet-held badges of `badges` (a list or
+    an expression) to citizenProfile.badges, each with a badgeHistory entry"""
+    current = {"$ifNull": ["$citizenProfile.badges", []]}
+    return [
+        {"$set": {"_awarded": {"$filter": {"input": badges, "cond": {"$not": [{"$in": ["$$this", current]}]}}}}},
+        {"$set": {
+            "citizenProfile.badges": {"$concatArrays": [current, "$_awarded"]},
+            "badgeHistory": {"$concatArrays": [
+                {"$ifNull": ["$badgeHistory", []]},
+                {"$map": {"input": "$_awarded", "in": {"id": "$$this", "ts": awarded_at}}}
+            ]}
+        }},
+        {"$unset": "_awarded"},
+    ]
+
+# The fields search_citizens returns, and how many citizens it returns at most
+_SEARCH_LIMIT = 20
+_CITIZEN_SEARCH_PROJECTION = {
+    "fullName": 1, "location": 1, "citizenProfile.level": 1, "citizenProfile.totalPoints": 1, "reputation": 1
+}
+
+# Demo activity feed - shared, never mutated; callers get a fresh list of these
+_DEMO_ACTIVITIES = (
+    {
+        "id": "act_001",
+        "type": "report_submitted",
+        "title": "Waste Report Submitted",
+        "description": "Plastic waste reported at Park Street",
+        "timestamp": "2025-01-20T10:30:00Z",
+        "points": 25,
+        "icon": "ðŸ“"
+    },
+    {
+        "id": "act_002", 
+        "type": "badge_earned",
+        "title": "Badge Unlocked!",
+        "description": "Earned 'Sharp Eye' badge",
+        "timestamp": "2025-01-19T15:45:00Z",
+        "points": 50,
+        "icon": "ðŸ†"
+    },
+    {
+        "id": "act_003",
+        "type": "level_up",
+        "title": "Level Up!",
+        "description": "Advanced to Eco Warrior level",
+        "timestamp": "2025-01-18T12:00:00Z",
+        "points": 0,
+        "icon": "â¬†ï¸"
+    }
+)
+
+# Demo leaderboard and rank without a database - shared, never mutated
+_DEMO_LEADERBOARD = (
+    {
+        "rank": 1,
+        "userId": "user_001",
+        "fullName": "Priya Sharma",
+        "points": 450,
+        "reports": 18,
+        "level": "eco_champion"
+    },
+    {
+        "rank": 2,
+        "userId": "user_002",
+        "fullName": "Rajesh Kumar", 
+        "points": 420,
+        "reports": 16,
+        "level": "waste_warrior"
+    },
+    {
+        "rank": 3,
+        "userId": "demo_citizen_123",
+        "fullName": "Demo EcoWarrior",
+        "points": 150,
+        "reports": 3,
+        "level": "eco_warrior"
+    }
+)
+_DEMO_RANK = MappingProxyType({"rank": 3, "totalParticipants": 127, "percentile": 97.6})
+
+# Leaderboards are materialized into leaderboards_<period> by refresh_leaderboard
+# (period -> points window; None ranks on the all-time totalPoints)
+_LEADERBOARD_PERIODS = MappingProxyType({
+    "weekly": timedelta(days=7),
+    "monthly": timedelta(days=30),
+    "all_time": None,
+})
+_LEADERBOARD_SIZE = 1000
+_LEADERBOARD_REFRESH_SECONDS = 300
+
+# Tail of every leaderboard pipeline: rank the entries on points in one window
+# pass (ties share a rank)
+_LEADERBOARD_RANK_STAGES = (
+    {"$setWindowFields": {"sortBy": {"points": -1}, "output": {"rank": {"$rank": {}}}}},
+)
 
 class CitizenService:
     """Enhanced business logic for EcoWarrior (Citizen) operations"""
     
     def __init__(self):
         self.database = None
+        self._init_lock = asyncio.Lock()
+        self._initialized = False
+        self._users_fast = None
+        self._points_tx_fast = None
+        self._tx_buffer: List[Dict[str, Any]] = []
+        self._tx_timer: Optional[asyncio.Task] = None
+        self._tx_flushes: set = set()
+        self._leaderboard_task: Optional[asyncio.Task] = None
+        # Bumped after every leaderboard refresh - cached leaderboard pages key on it
+        self.leaderboard_generation = 0
+        self._badge_inflight: Dict[str, asyncio.Task] = {}
     
     async def initialize(self):
-        """Initialize database connection - FIXED VERSION"""
-        try:
-            from ..shared.database import database
-            
-            # 🔥 FIX: Proper database check
-            if (hasattr(database, 'database') and 
-                database.database is not None and 
-                hasattr(database, 'is_connected') and 
-                database.is_connected):
-                
-                self.database = database.database
-                print("✅ CitizenService database initialized")
+        """Initialize database connection - idempotent; concurrent first requests wait on one attempt"""
+        async with self._init_lock:
+            if self._initialized:
                 return True
-            else:
-                print("⚠️ Database not available for CitizenService")
+            
+            try:
+                if database.ready:
+                    self.database = database.database
+                    self._users_fast = self.database.users.with_options(write_concern=_FAST_WRITE_CONCERN)
+                    self._points_tx_fast = self.database.points_transactions.with_options(write_concern=_FAST_WRITE_CONCERN)
+                    self._initialized = True
+                    logger.debug("✅ CitizenService database initialized")
+                    return True
+                else:
+                    # Not marked initialized - the next call tries again
+                    logger.warning("⚠️ Database not available for CitizenService")
+                    self.database = None
+                    return False
+                    
+            except Exception as e:
+                logger.error("❌ CitizenService init error: %s", e)
                 self.database = None
                 return False
-                
-        except Exception as e:
-            print(f"❌ CitizenService init error: {e}")
-            self.database = None
-            return False
     
     # ===================
     # USER MANAGEMENT
     # ===================
     
-    async def get_citizen_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """Get citizen by user ID - FIXED VERSION"""
-        print(f"🔍 SERVICE: Looking for user_id: {user_id}")
+    async def get_citizen_by_id(self, user_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Get citizen by user ID - FIXED VERSION (projection limits the fields read from Mongo, default _CITIZEN_PROJECTION)"""
+        logger.debug("🔍 SERVICE: Looking for user_id: %s", user_id)
         try:
             # Initialize if needed
-            if not hasattr(self, 'database') or self.database is None:
+            if self.database is None:
                 await self.initialize()
             
-            # 🔥 FIX: Proper database check
             try:
-                from ..shared.database import database
-                if (hasattr(database, 'database') and 
-                    database.database is not None and 
-                    hasattr(database, 'is_connected') and 
-                    database.is_connected):
+                if database.ready:
                     
-                    # Handle demo IDs
-                    if user_id.startswith('demo'):
+                    # Handle demo IDs (and ids that could never match) without raising
+                    user_oid = _to_oid(user_id)
+                    if user_oid is None:
                         return self.create_demo_citizen()
                     
+                    projection = projection or _CITIZEN_PROJECTION
+                    projection_key = tuple(projection)
+                    cached = _citizen_cache.get(user_id)
+                    if cached is not None and projection_key in cached:
+                        return copy.deepcopy(cached[projection_key])
+                    
                     # Get from database
                     user = await database.database.users.find_one({
-                        "_id": ObjectId(user_id),
+                        "_id": user_oid,
                         "role": "citizen"
-                    })
+                    }, projection)
                     
                     if user:
+                        # Keep the parsed ObjectId for writes; _id stays a string for templates/JSON
+                        user["_oid"] = user["_id"]
                         user["_id"] = str(user["_id"])
-                        return self.ensure_citizen_fields(user)
+                        user = self.ensure_citizen_fields(user)
+                        if cached is None:
+                            cached = _citizen_cache[user_id] = {}
+                        cached[projection_key] = user
+                        return copy.deepcopy(user)
                 else:
-                    print("⚠️ Database not available, using demo citizen")
+                    logger.warning("⚠️ Database not available, using demo citizen")
                     return self.create_demo_citizen()
                     
             except Exception as db_error:
-                print(f"❌ Database lookup error: {db_error}")
+                logger.error("❌ Database lookup error: %s", db_error)
                 return self.create_demo_citizen()
             
             return None
             
         except Exception as e:
-            print(f"❌ Error getting citizen by ID: {e}")
+            logger.error("❌ Error getting citizen by ID: %s", e)
             return None
     
     async def get_citizen_by_email(self, email: str) -> Optional[Dict[str, Any]]:
@@ -96,7 +457,7 @@ class CitizenService:
             user = await self.database.users.find_one({
                 "email": email.lower().strip(),
                 "role": "citizen"
-            })
+            }, _CITIZEN_PROJECTION)
             
             if user:
                 user["_id"] = str(user["_id"])
@@ -105,12 +466,20 @@ class CitizenService:
             return None
             
         except Exception as e:
-            print(f"âŒ Error getting citizen by email: {e}")
+            logger.error("❌ Error getting citizen by email: %s", e)
             return None
     
-    async def get_citizen_from_session(self, user_info: Dict[str, Any]) -> Dict[str, Any]:
-        """Get citizen data from session info"""
+    async def get_citizen_from_session(self, user_info: Dict[str, Any], prefer_session: bool = False) -> Dict[str, Any]:
+        """Get citizen data from session info
+        
+        prefer_session=True is for widgets that only show what the session carries
+        (name, email, verification, reputation) - no database round trip then.
+        Pages that need points/badges keep the default and read the stored profile.
+        """
         try:
+            if prefer_session and user_info.get('fullName') and user_info.get('email'):
+                return self.create_citizen_from_session(user_info)
+            
             user_id = user_info.get('userId')
             
             if user_id:
@@ -123,7 +492,7 @@ class CitizenService:
             return self.create_citizen_from_session(user_info)
             
         except Exception as e:
-            print(f"âŒ Error getting citizen from session: {e}")
+            logger.error("❌ Error getting citizen from session: %s", e)
             return self.create_demo_citizen()
     
     def create_citizen_from_session(self, user_info: Dict[str, Any]) -> Dict[str, Any]:
@@ -144,69 +513,23 @@ class CitizenService:
     
     def create_demo_citizen(self) -> Dict[str, Any]:
         """Create demo citizen for testing"""
-        user = {
-            "_id": "demo_citizen_123",
-            "fullName": "Demo EcoWarrior",
-            "email": "demo@example.com",
-            "phone": "+91-9876543210",
-            "role": "citizen",
-            "isActive": True,
-            "isVerified": True,
-            "emailVerified": True,
-            "phoneVerified": True,
-            "reputation": 4.8,
-            "createdAt": datetime.utcnow(),
-            "profilePicture": "https://via.placeholder.com/400x400/22c55e/ffffff?text=Demo"
-        }
-        
-        return self.ensure_citizen_fields(user)
+        return self.ensure_citizen_fields({**_DEMO_CITIZEN_TEMPLATE, "createdAt": datetime.utcnow()})
     
     def ensure_citizen_fields(self, user: Dict[str, Any]) -> Dict[str, Any]:
         """Ensure user has all required fields for citizen"""
         if not user:
             return self.create_demo_citizen()
         
-        # Ensure citizenProfile exists
+        # Nested defaults are copied - callers mutate the user they get back
         if "citizenProfile" not in user:
-            user["citizenProfile"] = {
-                "totalReports": 3,
-                "totalPoints": 150,
-                "level": "eco_warrior",
-                "badges": ["first_report", "weekend_warrior"],
-                "languagePreference": "en",
-                "notificationPreferences": ["push", "sms"]
-            }
+            user["citizenProfile"] = copy.deepcopy(dict(_DEFAULT_CITIZEN_PROFILE))
         
-        # Ensure location exists
         if "location" not in user:
-            user["location"] = {
-                "state": "Andhra Pradesh",
-                "city": "Yanamalakuduru", 
-                "pincode": "521456",
-                "address": "123 Green Street, Yanamalakuduru, AP"
-            }
+            user["location"] = dict(_DEFAULT_LOCATION)
         
         # Ensure basic fields exist
-        if "reputation" not in user:
-            user["reputation"] = 5.0
-        
-        if "isActive" not in user:
-            user["isActive"] = True
-        
-        if "isVerified" not in user:
-            user["isVerified"] = True
-            
-        if "emailVerified" not in user:
-            user["emailVerified"] = True
-            
-        if "phoneVerified" not in user:
-            user["phoneVerified"] = True
-        
-        if "phone" not in user:
-            user["phone"] = "+91-9876543210"
-            
-        if "profilePicture" not in user:
-            user["profilePicture"] = None
+        for field, value in _CITIZEN_FIELD_DEFAULTS.items():
+            user.setdefault(field, value)
         
         return user
     
@@ -221,204 +544,128 @@ class CitizenService:
                 await self.initialize()
             
             if self.database is None:
-                print("âš ï¸ Database not available for profile update - using demo mode")
+                logger.warning("⚠️ Database not available for profile update - using demo mode")
                 return True  # Return success for demo mode
             
-            print(f"ðŸ“ Updating profile for user: {user_id}")
-            print(f"ðŸ“„ Update data: {update_data}")
+            logger.debug("📝 Updating profile for user: %s", user_id)
             
             # Prepare update data with validation
             update_fields = {
                 "updatedAt": datetime.utcnow()
             }
             
-            # Handle basic profile fields
-            if "fullName" in update_data:
-                if len(update_data["fullName"].strip()) >= 2:
-                    update_fields["fullName"] = update_data["fullName"].strip()
-                else:
-                    raise ValueError("Full name must be at least 2 characters")
-            
-            if "phone" in update_data:
-                phone = update_data["phone"].strip()
-                import re
-                if re.match(r'^\+91-\d{10}$', phone):
-                    update_fields["phone"] = phone
-                else:
-                    raise ValueError("Phone must be in format +91-XXXXXXXXXX")
-            
-            # Handle location data
-            if "location" in update_data:
-                location_data = update_data["location"]
-                location_update = {}
-                
-                # Validate and update location fields
-                if "state" in location_data and location_data["state"]:
-                    location_update["location.state"] = location_data["state"].strip()
-                
-                if "city" in location_data and location_data["city"]:
-                    location_update["location.city"] = location_data["city"].strip()
-                
-                if "pincode" in location_data and location_data["pincode"]:
-                    pincode = location_data["pincode"].strip()
-                    if re.match(r'^\d{6}$', pincode):
-                        location_update["location.pincode"] = pincode
-                    else:
-                        raise ValueError("Pincode must be 6 digits")
-                
-                if "address" in location_data and location_data["address"]:
-                    location_update["location.address"] = location_data["address"].strip()
-                
-                # Add location updates
-                update_fields.update(location_update)
-            
-            # Handle citizen profile updates
-            if "citizenProfile" in update_data:
-                citizen_profile = update_data["citizenProfile"]
-                
-                # Language preference
-                if "languagePreference" in citizen_profile:
-                    valid_languages = ["en", "hi", "te", "ta", "bn"]
-                    if citizen_profile["languagePreference"] in valid_languages:
-                        update_fields["citizenProfile.languagePreference"] = citizen_profile["languagePreference"]
-                    else:
-                        raise ValueError("Invalid language preference")
-                
-                # Notification preferences
-                if "notificationPreferences" in citizen_profile:
-                    valid_notifications = ["push", "sms", "email"]
-                    prefs = citizen_profile["notificationPreferences"]
-                    if isinstance(prefs, list) and all(p in valid_notifications for p in prefs):
-                        update_fields["citizenProfile.notificationPreferences"] = prefs
-                    else:
-                        raise ValueError("Invalid notification preferences")
-            
-            # Handle profile picture
-            if "profilePicture" in update_data:
-                update_fields["profilePicture"] = update_data["profilePicture"]
-            
-            # Handle account status updates
-            if "isActive" in update_data:
-                update_fields["isActive"] = bool(update_data["isActive"])
-            
-            if "deactivatedAt" in update_data:
-                update_fields["deactivatedAt"] = update_data["deactivatedAt"]
-            
-            if "deactivationReason" in update_data:
-                update_fields["deactivationReason"] = update_data["deactivationReason"]
-            
-            print(f"ðŸ’¾ Final update fields: {update_fields}")
+            # One pass over the field table; missing or empty values are left alone
+            for src, dst, clean, is_valid, error in _PROFILE_FIELD_MAP:
+                value = _lookup(update_data, src)
+                if value is _MISSING or value is None or value == "":
+                    continue
+                if clean is not None:
+                    value = clean(value)
+                if is_valid is not None and not is_valid(value):
+                    raise ValueError(error)
+                update_fields[dst] = value
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("💾 Final update fields: %s", list(update_fields))
+            
+            user_oid = _to_oid(user_id)
+            if user_oid is None:
+                return False
             
             # Perform database update
             result = await self.database.users.update_one(
-                {"_id": ObjectId(user_id), "role": "citizen"},
+                {"_id": user_oid, "role": "citizen"},
                 {"$set": update_fields}
             )
             
             success = result.modified_count > 0
-            print(f"âœ… Database update result: {success} (modified: {result.modified_count})")
+            logger.debug("✅ Database update result: %s (modified: %s)", success, result.modified_count)
+            if success:
+                invalidate_user_cache(user_id)
             
             return success
             
         except ValueError as ve:
-            print(f"âŒ Validation error: {ve}")
+            logger.error("❌ Validation error: %s", ve)
             raise HTTPException(status_code=400, detail=str(ve))
         except Exception as e:
-            print(f"âŒ Error updating citizen profile: {e}")
+            logger.error("❌ Error updating citizen profile: %s", e)
             return False
     
     async def get_citizen_profile_complete(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get complete citizen profile with enhanced details"""
         try:
-            user = await self.get_citizen_by_id(user_id)
+            # The two lookups are independent - overlap their round trips
+            user, activity = await asyncio.gather(
+                self.get_citizen_by_id(user_id),
+                self.get_citizen_activity(user_id),
+                return_exceptions=True
+            )
             
-            if not user:
+            if not user or isinstance(user, BaseException):
                 return None
             
+            # A failed side lookup falls back to empty figures instead of failing the profile
+            if isinstance(activity, BaseException):
+                activity = {"monthlyStats": dict(_EMPTY_MONTHLY_STATS), "environmentalImpact": dict(_EMPTY_IMPACT)}
+            monthly_stats = activity["monthlyStats"]
+            impact = activity["environmentalImpact"]
+            
             # Add calculated fields
             profile = {
                 **user,
                 "profileCompleteness": self.calculate_profile_completeness(user),
                 "nextLevelProgress": self.calculate_level_progress(user),
-                "monthlyStats": await self.get_monthly_stats(user_id),
+                "monthlyStats": monthly_stats,
                 "recentBadges": self.get_recent_badges(user),
-                "environmentalImpact": await self.calculate_environmental_impact(user_id)
+                "environmentalImpact": impact
             }
             
             return profile
             
         except Exception as e:
-            print(f"âŒ Error getting complete profile: {e}")
+            logger.error("❌ Error getting complete profile: %s", e)
             return None
     
     def calculate_profile_completeness(self, user: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate profile completion percentage"""
         try:
-            required_fields = [
-                "fullName", "email", "phone", 
-                "location.state", "location.city", "location.pincode", "location.address"
-            ]
-            
             completed = 0
-            total = len(required_fields)
-            
-            for field in required_fields:
-                if "." in field:
-                    # Nested field check
-                    keys = field.split(".")
-                    value = user
-                    for key in keys:
-                        value = value.get(key, "") if value else ""
-                else:
-                    value = user.get(field, "")
+            missing_fields = []
+            
+            # One walk per field; the missing list falls out of the same pass
+            for path in _REQUIRED_PROFILE_FIELDS:
+                value = user
+                for key in path:
+                    value = value.get(key) if isinstance(value, dict) else None
                 
                 if value and str(value).strip():
                     completed += 1
+                else:
+                    missing_fields.append(".".join(path))
             
+            total = len(_REQUIRED_PROFILE_FIELDS)
             percentage = int((completed / total) * 100)
             
             return {
                 "percentage": percentage,
                 "completed": completed,
                 "total": total,
-                "missingFields": [field for field in required_fields if not self._has_field_value(user, field)]
+                "missingFields": missing_fields
             }
             
         except Exception as e:
-            print(f"âŒ Error calculating profile completeness: {e}")
+            logger.error("❌ Error calculating profile completeness: %s", e)
             return {"percentage": 80, "completed": 6, "total": 7, "missingFields": []}
     
-    def _has_field_value(self, user: Dict[str, Any], field: str) -> bool:
-        """Check if a field has a value (including nested fields)"""
-        try:
-            if "." in field:
-                keys = field.split(".")
-                value = user
-                for key in keys:
-                    value = value.get(key, "") if value else ""
-            else:
-                value = user.get(field, "")
-            
-            return bool(value and str(value).strip())
-        except:
-            return False
-    
     def calculate_level_progress(self, user: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate progress to next level"""
         try:
-            current_points = user["citizenProfile"]["totalPoints"]
-            current_level = user["citizenProfile"]["level"]
-            
-            # Define level thresholds
-            level_thresholds = {
-                "eco_rookie": {"min": 0, "max": 100, "next": "eco_warrior"},
-                "eco_warrior": {"min": 100, "max": 300, "next": "waste_warrior"},
-                "waste_warrior": {"min": 300, "max": 600, "next": "green_guardian"},
-                "green_guardian": {"min": 600, "max": 1000, "next": "eco_champion"},
-                "eco_champion": {"min": 1000, "max": float('inf'), "next": "max_level"}
-            }
+            profile = user["citizenProfile"]
+            current_points = profile["totalPoints"]
+            current_level = profile["level"]
             
-            level_info = level_thresholds.get(current_level, level_thresholds["eco_rookie"])
+            level_info = _LEVEL_THRESHOLDS.get(current_level, _LEVEL_THRESHOLDS["eco_rookie"])
             
             if level_info["next"] == "max_level":
                 return {
@@ -441,7 +688,7 @@ class CitizenService:
             }
             
         except Exception as e:
-            print(f"âŒ Error calculating level progress: {e}")
+            logger.error("❌ Error calculating level progress: %s", e)
             return {
                 "currentLevel": "eco_warrior",
                 "nextLevel": "waste_warrior", 
@@ -453,17 +700,82 @@ class CitizenService:
     async def get_monthly_stats(self, user_id: str) -> Dict[str, Any]:
         """Get current month statistics"""
         try:
-            # TODO: Implement actual monthly stats from database
+            return (await self.get_citizen_activity(user_id))["monthlyStats"]
+        except Exception as e:
+            logger.error("❌ Error getting monthly stats: %s", e)
+            return dict(_EMPTY_MONTHLY_STATS)
+    
+    async def get_citizen_activity(self, user_id: str) -> Dict[str, Any]:
+        """Monthly stats and environmental impact from one aggregation, cached per user"""
+        cached = _activity_cache.get(user_id)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        if not database.ready:
+            # Demo figures while running without a database
             return {
-                "reportsThisMonth": 8,
-                "pointsThisMonth": 200,
-                "rankThisMonth": 3,
-                "goalProgress": 80,  # Percentage of monthly goal
-                "streakDays": 5
+                "monthlyStats": {
+                    "reportsThisMonth": 8,
+                    "pointsThisMonth": 200,
+                    "rankThisMonth": 3,
+                    "goalProgress": 80,  # Percentage of monthly goal
+                    "streakDays": 5
+                },
+                "environmentalImpact": {
+                    "co2Saved": 125.5,  # kg CO2
+                    "wasteRecycled": 45.2,  # kg
+                    "treesEquivalent": 3.2,  # trees saved
+                    "waterSaved": 2150  # liters
+                }
             }
-        except Exception as e:
-            print(f"âŒ Error getting monthly stats: {e}")
-            return {"reportsThisMonth": 0, "pointsThisMonth": 0, "rankThisMonth": 0, "goalProgress": 0, "streakDays": 0}
+        
+        now = datetime.utcnow()
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {"$facet": {
+                "impact": [{"$group": {"_id": None, **_IMPACT_SUMS}}],
+                # One row per active day this month - enough for counts, points and the streak
+                "days": [
+                    {"$match": {"created_at": {"$gte": month_start}}},
+                    {"$group": {
+                        "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                        "reports": {"$sum": 1},
+                        "points": {"$sum": "$content.eco_points"}
+                    }}
+                ]
+            }}
+        ]
+        facets = await database.requests.aggregate(pipeline).to_list(length=1)
+        facet = facets[0] if facets else {"impact": [], "days": []}
+        
+        sums = facet["impact"][0] if facet["impact"] else _EMPTY_IMPACT
+        impact = {key: round(sums.get(key) or 0, 1) for key in _EMPTY_IMPACT}
+        
+        days = {row["_id"]: row for row in facet["days"]}
+        reports = sum(row["reports"] for row in days.values())
+        
+        # Consecutive active days ending today (or yesterday, if nothing yet today)
+        streak = 0
+        day = now.date()
+        if day.isoformat() not in days:
+            day -= timedelta(days=1)
+        while day.isoformat() in days:
+            streak += 1
+            day -= timedelta(days=1)
+        
+        activity = {
+            "monthlyStats": {
+                "reportsThisMonth": reports,
+                "pointsThisMonth": sum(row["points"] or 0 for row in days.values()),
+                "rankThisMonth": 0,
+                "goalProgress": min(100, reports * 100 // _MONTHLY_REPORT_GOAL),  # Percentage of monthly goal
+                "streakDays": streak
+            },
+            "environmentalImpact": impact
+        }
+        _activity_cache[user_id] = activity
+        return copy.deepcopy(activity)
     
     def get_recent_badges(self, user: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Get recently earned badges"""
@@ -500,22 +812,16 @@ class CitizenService:
             return recent_badges
             
         except Exception as e:
-            print(f"âŒ Error getting recent badges: {e}")
+            logger.error("❌ Error getting recent badges: %s", e)
             return []
     
     async def calculate_environmental_impact(self, user_id: str) -> Dict[str, Any]:
         """Calculate environmental impact metrics"""
         try:
-            # TODO: Implement actual impact calculation from reports
-            return {
-                "co2Saved": 125.5,  # kg CO2
-                "wasteRecycled": 45.2,  # kg
-                "treesEquivalent": 3.2,  # trees saved
-                "waterSaved": 2150  # liters
-            }
+            return (await self.get_citizen_activity(user_id))["environmentalImpact"]
         except Exception as e:
-            print(f"âŒ Error calculating environmental impact: {e}")
-            return {"co2Saved": 0, "wasteRecycled": 0, "treesEquivalent": 0, "waterSaved": 0}
+            logger.error("❌ Error calculating environmental impact: %s", e)
+            return dict(_EMPTY_IMPACT)
     
     # ===================
     # STATISTICS & ANALYTICS
@@ -524,7 +830,7 @@ class CitizenService:
     async def get_citizen_stats(self, user_id: str) -> Dict[str, Any]:
         """Get citizen statistics"""
         try:
-            user = await self.get_citizen_by_id(user_id)
+            user = await self.get_citizen_by_id(user_id, _CITIZEN_STATS_PROJECTION)
             
             if not user:
                 return {
@@ -535,16 +841,17 @@ class CitizenService:
                     "badges": []
                 }
             
+            profile = user["citizenProfile"]
             return {
-                "totalReports": user["citizenProfile"]["totalReports"],
-                "totalPoints": user["citizenProfile"]["totalPoints"],
-                "level": user["citizenProfile"]["level"],
+                "totalReports": profile["totalReports"],
+                "totalPoints": profile["totalPoints"],
+                "level": profile["level"],
                 "reputation": user["reputation"],
-                "badges": user["citizenProfile"].get("badges", [])
+                "badges": profile.get("badges", [])
             }
             
         except Exception as e:
-            print(f"âŒ Error getting citizen stats: {e}")
+            logger.error("❌ Error getting citizen stats: %s", e)
             return {
                 "totalReports": 0,
                 "totalPoints": 0,
@@ -562,6 +869,10 @@ class CitizenService:
             if self.database is None:
                 return False
             
+            user_oid = _to_oid(user_id)
+            if user_oid is None:
+                return False
+            
             update_fields = {"updatedAt": datetime.utcnow()}
             
             # Update citizen profile stats
@@ -573,19 +884,22 @@ class CitizenService:
                 elif key == "badges":
                     update_fields["citizenProfile.badges"] = value
             
-            result = await self.database.users.update_one(
-                {"_id": ObjectId(user_id), "role": "citizen"},
+            result = await self._users_fast.update_one(
+                {"_id": user_oid, "role": "citizen"},
                 {"$set": update_fields}
             )
             
-            return result.modified_count > 0
+            if result.modified_count > 0:
+                invalidate_user_cache(user_id)
+                return True
+            return False
             
         except Exception as e:
-            print(f"âŒ Error updating citizen stats: {e}")
+            logger.error("❌ Error updating citizen stats: %s", e)
             return False
     
     async def add_citizen_badge(self, user_id: str, badge_id: str) -> bool:
-        """Add a new badge to citizen profile"""
+        """Add a new badge to citizen profile - True only if the citizen did not have it yet"""
         try:
             if self.database is None:
                 await self.initialize()
@@ -593,19 +907,31 @@ class CitizenService:
             if self.database is None:
                 return False
             
-            # Add badge to array if not already present
-            result = await self.database.users.update_one(
-                {"_id": ObjectId(user_id), "role": "citizen"},
+            user_oid = _to_oid(user_id)
+            if user_oid is None:
+                return False
+            
+            # Add badge to array if not already present; the badges from before the
+            # update tell "new badge" apart from "already had it" in the same op
+            before = await self._users_fast.find_one_and_update(
+                {"_id": user_oid, "role": "citizen"},
                 {
                     "$addToSet": {"citizenProfile.badges": badge_id},
                     "$set": {"updatedAt": datetime.utcnow()}
-                }
+                },
+                projection={"citizenProfile.badges": 1},
+                return_document=ReturnDocument.BEFORE
             )
             
-            return result.modified_count > 0
+            if before is None:
+                logger.warning("⚠️ No citizen %s to award %s", user_id, badge_id)
+                return False
+            
+            invalidate_user_cache(user_id)
+            return badge_id not in before.get("citizenProfile", {}).get("badges", [])
             
         except Exception as e:
-            print(f"âŒ Error adding badge: {e}")
+            logger.error("❌ Error adding badge: %s", e)
             return False
     
     async def increment_citizen_points(self, user_id: str, points: int, reason: str = "") -> bool:
@@ -617,42 +943,114 @@ class CitizenService:
             if self.database is None:
                 return False
             
-            # Get current user data
-            user = await self.get_citizen_by_id(user_id)
-            if not user:
+            user_oid = _to_oid(user_id)
+            if user_oid is None:
+                return False
+            
+            # Increment server-side and read back the new total in the same op -
+            # concurrent grants can no longer overwrite each other
+            user = await self.database.users.find_one_and_update(
+                {"_id": user_oid, "role": "citizen"},
+                {
+                    "$inc": {"citizenProfile.totalPoints": points},
+                    "$set": {"updatedAt": datetime.utcnow()}
+                },
+                projection={"citizenProfile.totalPoints": 1, "citizenProfile.level": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if user is None:
                 return False
+            invalidate_user_cache(user_id)
             
-            current_points = user["citizenProfile"]["totalPoints"]
-            new_points = current_points + points
+            profile = user["citizenProfile"]
+            new_points = profile["totalPoints"]
             
             # Check for level up
             new_level = self.calculate_level_from_points(new_points)
-            old_level = user["citizenProfile"]["level"]
-            
-            update_fields = {
-                "citizenProfile.totalPoints": new_points,
-                "updatedAt": datetime.utcnow()
-            }
+            old_level = profile.get("level")
             
             # Update level if changed
             if new_level != old_level:
-                update_fields["citizenProfile.level"] = new_level
-                print(f"ðŸŽ‰ Level up! {old_level} â†’ {new_level}")
-            
-            result = await self.database.users.update_one(
-                {"_id": ObjectId(user_id), "role": "citizen"},
-                {"$set": update_fields}
-            )
+                # A level's badge rides along with the level change
+                level_badge = _LEVEL_BADGES.get(new_level)
+                await self.database.users.update_one(
+                    {"_id": user["_id"]},
+                    [
+                        {"$set": {"citizenProfile.level": new_level}},
+                        *(_badge_award_stages([level_badge], datetime.utcnow()) if level_badge else ())
+                    ]
+                )
+                logger.info("🎉 Level up! %s → %s", old_level, new_level)
             
             # Log points transaction
-            await self.log_points_transaction(user_id, points, reason, new_points)
+            await self.log_points_transaction(user_oid, points, reason, new_points)
             
-            return result.modified_count > 0
+            return True
             
         except Exception as e:
-            print(f"âŒ Error incrementing points: {e}")
+            logger.error("❌ Error incrementing points: %s", e)
             return False
     
+    async def apply_reward(self, user_id: str, points: int, badges: Optional[List[str]] = None, reason: str = "") -> Optional[Dict[str, Any]]:
+        """Grant points, recompute the level and award badges in one update
+        
+        Returns {"totalPoints", "level", "newBadges"} or None if no citizen matched.
+        """
+        try:
+            if self.database is None:
+                await self.initialize()
+            
+            user_oid = _to_oid(user_id)
+            if self.database is None or user_oid is None:
+                return None
+            
+            badges = list(dict.fromkeys(badges or []))
+            now = datetime.utcnow()
+            
+            # Pipeline update: points, badges (appended in order, no duplicates,
+            # with badgeHistory), then the level from the new total and that
+            # level's badge - one atomic op
+            before = await self.database.users.find_one_and_update(
+                {"_id": user_oid, "role": "citizen"},
+                [
+                    {"$set": {
+                        "citizenProfile.totalPoints": {
+                            "$add": [{"$ifNull": ["$citizenProfile.totalPoints", 0]}, points]
+                        },
+                        "updatedAt": now
+                    }},
+                    *_badge_award_stages(badges, now),
+                    {"$set": {"citizenProfile.level": _LEVEL_FROM_POINTS_EXPR}},
+                    *_badge_award_stages(_LEVEL_BADGES_EXPR, now)
+                ],
+                projection={"citizenProfile.totalPoints": 1, "citizenProfile.level": 1, "citizenProfile.badges": 1},
+                return_document=ReturnDocument.BEFORE
+            )
+            if before is None:
+                return None
+            invalidate_user_cache(user_id)
+            
+            profile = before.get("citizenProfile", {})
+            new_points = profile.get("totalPoints", 0) + points
+            new_level = self.calculate_level_from_points(new_points)
+            level_badge = _LEVEL_BADGES.get(new_level)
+            if level_badge and level_badge not in badges:
+                badges.append(level_badge)
+            new_badges = [badge for badge in badges if badge not in profile.get("badges", [])]
+            
+            if new_level != profile.get("level"):
+                logger.info("🎉 Level up! %s → %s", profile.get("level"), new_level)
+            for badge_id in new_badges:
+                logger.info("🏆 New badge awarded: %s", badge_id)
+            
+            await self.log_points_transaction(user_oid, points, reason, new_points)
+            
+            return {"totalPoints": new_points, "level": new_level, "newBadges": new_badges}
+            
+        except Exception as e:
+            logger.error("❌ Error applying reward: %s", e)
+            return None
+    
     def calculate_level_from_points(self, points: int) -> str:
         """Calculate level based on points"""
         if points < 100:
@@ -669,70 +1067,146 @@ class CitizenService:
     async def log_points_transaction(self, user_id: str, points: int, reason: str, new_total: int):
         """Log points transaction for history"""
         try:
-            if self.database is None:
+            user_oid = _to_oid(user_id)
+            if self.database is None or user_oid is None:
                 return
             
             transaction = {
-                "userId": ObjectId(user_id),
+                "userId": user_oid,
                 "points": points,
                 "reason": reason,
                 "newTotal": new_total,
                 "timestamp": datetime.utcnow()
             }
             
-            await self.database.points_transactions.insert_one(transaction)
+            # Queued, not awaited - written by the next batch flush
+            self._tx_buffer.append(transaction)
+            if len(self._tx_buffer) >= _TX_BATCH_SIZE:
+                self._start_tx_flush(self.flush_points_transactions())
+            elif self._tx_timer is None or self._tx_timer.done():
+                self._tx_timer = self._start_tx_flush(self._flush_tx_after(_TX_FLUSH_SECONDS))
             
         except Exception as e:
-            print(f"âŒ Error logging points transaction: {e}")
+            logger.error("❌ Error logging points transaction: %s", e)
+    
+    def _start_tx_flush(self, coro) -> asyncio.Task:
+        """Run a flush in the background, holding a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self._tx_flushes.add(task)
+        task.add_done_callback(self._tx_flushes.discard)
+        return task
+    
+    async def _flush_tx_after(self, delay: float):
+        await asyncio.sleep(delay)
+        await self.flush_points_transactions()
+    
+    async def flush_points_transactions(self):
+        """Write every buffered points transaction in one insert_many (also called at shutdown)"""
+        # Swapped before the first await, so concurrent flushes never share entries
+        batch, self._tx_buffer = self._tx_buffer, []
+        if not batch or self.database is None:
+            return
+        
+        try:
+            await self._points_tx_fast.insert_many(batch, ordered=False)
+        except Exception as e:
+            logger.error("❌ Error logging points transactions: %s", e)
     
     # ===================
     # SERVICE REQUESTS (Future Implementation)
     # ===================
     
-    async def get_citizen_requests(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get citizen's service requests - FIXED VERSION"""
+    async def get_citizen_requests(
+        self,
+        user_id: str,
+        limit: int = 10,
+        after: Optional[tuple] = None,
+        status: Optional[str] = None,
+        skip: int = 0
+    ) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+        """Get citizen's service requests, newest first - FIXED VERSION
+        
+        after is the (created_at, ObjectId) of the last request on the previous
+        page; the next page starts strictly below it (keyset pagination). skip is
+        only for old page-numbered callers.
+        
+        Returns (requests, next_after): next_after is the stored keyset position of
+        this page's last request, or None when there is no next page - including when
+        that request has no stored created_at date, which a keyset cannot continue from.
+        """
         try:
             # Initialize database if not done
-            if not hasattr(self, 'database') or self.database is None:
+            if self.database is None:
                 await self.initialize()
             
-            # 🔥 FIX: Check database properly without using bool()
             try:
-                from ..shared.database import database
-                # Check if database instance exists and is connected
-                if (hasattr(database, 'database') and 
-                    database.database is not None and 
-                    hasattr(database, 'is_connected') and 
-                    database.is_connected):
+                if database.ready:
                     
-                    print(f"✅ Database available - getting requests for user: {user_id}")
+                    logger.debug("✅ Database available - getting requests for user: %s", user_id)
                     
                     # Query requests from database
-                    cursor = database.database.requests.find({
-                        "user_id": user_id
-                    }).sort("created_at", -1).limit(limit)
+                    query = {"user_id": user_id}
+                    if status:
+                        query["status"] = status
+                    if after is not None:
+                        created_at, last_id = after
+                        query["$or"] = [
+                            {"created_at": {"$lt": created_at}},
+                            {"created_at": created_at, "_id": {"$lt": last_id}}
+                        ]
+                    cursor = database.requests.find(query, _REQUEST_LIST_PROJECTION).sort(
+                        [("created_at", -1), ("_id", -1)]
+                    ).skip(skip).limit(limit).batch_size(limit)  # one batch - no getMore at the page boundary
+                    docs = await cursor.to_list(length=limit)
                     
-                    requests = await cursor.to_list(length=limit)
+                    # Keyset position from the stored values, before created_at is filled in
+                    next_after = None
+                    if len(docs) == limit and isinstance(docs[-1].get("created_at"), datetime):
+                        next_after = (docs[-1]["created_at"], docs[-1]["_id"])
                     
-                    # Process requests
-                    for req in requests:
-                        req["_id"] = str(req["_id"])
-                        if not req.get("created_at"):
-                            req["created_at"] = datetime.utcnow()
+                    # Process requests in the same pass that builds the list
+                    now = datetime.utcnow()
+                    requests = [
+                        {**req, "_id": str(req["_id"]), "created_at": req.get("created_at") or now}
+                        for req in docs
+                    ]
                     
-                    print(f"✅ Found {len(requests)} requests from database")
-                    return requests
+                    logger.debug("✅ Found %s requests from database", len(requests))
+                    return requests, next_after
                 else:
-                    print("⚠️ Database not available - returning empty list")
-                    return []
+                    logger.warning("⚠️ Database not available - returning empty list")
+                    return [], None
                     
             except Exception as db_error:
-                print(f"❌ Database query error: {db_error}")
-                return []
+                logger.error("❌ Database query error: %s", db_error)
+                return [], None
                 
         except Exception as e:
-            print(f"❌ Service get_citizen_requests error: {e}")
-            return []
+            logger.error("❌ Service get_citizen_requests error: %s", e)
+            return [], None
+    
+    async def count_citizen_requests(self, user_id: str, status: Optional[str] = None) -> int:
+        """Total requests for a user (optionally one status), cached for a short while"""
+        counts = _request_count_cache.get(user_id)
+        if counts is not None and status in counts:
+            return counts[status]
+        
+        try:
+            if not database.ready:
+                return 0
+            
+            query = {"user_id": user_id}
+            if status:
+                query["status"] = status
+            total = await database.requests.count_documents(query)
+        except Exception as e:
+            logger.error("❌ Service count_citizen_requests error: %s", e)
+            return 0
+        
+        if counts is None:
+            counts = _request_count_cache[user_id] = {}
+        counts[status] = total
+        return total
     
     async def create_service_request(self, user_id: str, request_data: Dict[str, Any]) -> Optional[str]:
         """Create new service request"""
@@ -750,11 +1224,11 @@ class CitizenService:
             import random
             request_id = f"WR_2025_{random.randint(1000, 9999)}"
             
-            print(f"ðŸ“ Created service request: {request_id}")
+            logger.debug("📝 Created service request: %s", request_id)
             return request_id
             
         except Exception as e:
-            print(f"âŒ Error creating service request: {e}")
+            logger.error("❌ Error creating service request: %s", e)
             return None
     
     # ===================
@@ -769,46 +1243,114 @@ class CitizenService:
             
             if self.database is None:
                 # Return demo leaderboard
-                return [
-                    {
-                        "rank": 1,
-                        "userId": "user_001",
-                        "fullName": "Priya Sharma",
-                        "points": 450,
-                        "reports": 18,
-                        "level": "eco_champion",
-                        "avatar": "https://via.placeholder.com/40x40/22c55e/ffffff?text=PS"
-                    },
-                    {
-                        "rank": 2,
-                        "userId": "user_002",
-                        "fullName": "Rajesh Kumar", 
-                        "points": 420,
-                        "reports": 16,
-                        "level": "waste_warrior",
-                        "avatar": "https://via.placeholder.com/40x40/3b82f6/ffffff?text=RK"
-                    },
-                    {
-                        "rank": 3,
-                        "userId": "demo_citizen_123",
-                        "fullName": "Demo EcoWarrior",
-                        "points": 150,
-                        "reports": 3,
-                        "level": "eco_warrior",
-                        "avatar": "https://via.placeholder.com/40x40/f59e0b/ffffff?text=DE"
-                    }
-                ]
+                return list(_DEMO_LEADERBOARD[:limit])
             
-            # TODO: Implement actual leaderboard query
-            # Based on period (weekly, monthly, all-time)
-            # Sort by points/reports in descending order
+            if period not in _LEADERBOARD_PERIODS:
+                return []
             
-            return []
+            # Materialized by refresh_leaderboard - a short read in rank order
+            cursor = self.database[f"leaderboards_{period}"].find({}, projection={"_id": 0})
+            return await cursor.sort("rank", 1).limit(limit).to_list(length=limit)
             
         except Exception as e:
-            print(f"âŒ Error getting leaderboard: {e}")
+            logger.error("❌ Error getting leaderboard: %s", e)
             return []
     
+    async def refresh_leaderboard(self, period: str) -> None:
+        """Rebuild leaderboards_<period> server-side ($out swaps it in atomically)"""
+        since = _LEADERBOARD_PERIODS[period]
+        
+        if since is None:
+            pipeline = [
+                {"$match": {**_CITIZEN_BASE_FILTER}},
+                {"$sort": {"citizenProfile.totalPoints": -1}},
+                {"$limit": _LEADERBOARD_SIZE},
+                {"$project": {
+                    "_id": 0,
+                    "userId": {"$toString": "$_id"},
+                    "fullName": 1,
+                    "points": "$citizenProfile.totalPoints",
+                    "reports": "$citizenProfile.totalReports",
+                    "level": "$citizenProfile.level"
+                }},
+            ]
+            source = self.database.users
+        else:
+            # Points earned inside the window, from the points history
+            pipeline = [
+                {"$match": {"timestamp": {"$gte": datetime.utcnow() - since}}},
+                {"$group": {"_id": "$userId", "points": {"$sum": "$points"}}},
+                {"$sort": {"points": -1}},
+                {"$limit": _LEADERBOARD_SIZE},
+                {"$lookup": {
+                    "from": "users",
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "pipeline": [
+                        {"$match": {**_CITIZEN_BASE_FILTER}},
+                        {"$project": {"fullName": 1, "citizenProfile.totalReports": 1, "citizenProfile.level": 1}}
+                    ],
+                    "as": "user"
+                }},
+                {"$unwind": "$user"},
+                {"$project": {
+                    "_id": 0,
+                    "userId": {"$toString": "$_id"},
+                    "fullName": "$user.fullName",
+                    "points": 1,
+                    "reports": "$user.citizenProfile.totalReports",
+                    "level": "$user.citizenProfile.level"
+                }},
+            ]
+            source = self.database.points_transactions
+        
+        target = f"leaderboards_{period}"
+        pipeline += [*_LEADERBOARD_RANK_STAGES, {"$out": target}]
+        await source.aggregate(pipeline).to_list(length=None)
+        await self.database[target].create_index("rank")
+    
+    async def refresh_leaderboards(self) -> int:
+        """Refresh every period; returns how many succeeded
+        
+        leaderboard_generation only moves when something was rebuilt, so a database
+        outage does not throw away the route's cached pages on every pass.
+        """
+        if self.database is None and not await self.initialize():
+            return 0
+        refreshed = 0
+        for period in _LEADERBOARD_PERIODS:
+            try:
+                await self.refresh_leaderboard(period)
+                refreshed += 1
+            except Exception as e:
+                logger.error("❌ Error refreshing %s leaderboard: %s", period, e)
+        if refreshed:
+            self.leaderboard_generation += 1
+            logger.debug("🏆 Leaderboards refreshed (%s/%s)", refreshed, len(_LEADERBOARD_PERIODS))
+        return refreshed
+    
+    async def start_leaderboard_refresh(self) -> None:
+        """Build the leaderboards once, then keep refreshing them (called on app startup)
+        
+        The first build is awaited so the endpoint never serves the empty
+        collections of a fresh deployment.
+        """
+        if self._leaderboard_task is None or self._leaderboard_task.done():
+            await self.refresh_leaderboards()
+            self._leaderboard_task = asyncio.create_task(self._refresh_leaderboards_forever())
+    
+    async def stop_leaderboard_refresh(self) -> None:
+        """Cancel the periodic leaderboard refresh (called on app shutdown)"""
+        task, self._leaderboard_task = self._leaderboard_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    
+    async def _refresh_leaderboards_forever(self):
+        while True:
+            await asyncio.sleep(_LEADERBOARD_REFRESH_SECONDS)
+            await self.refresh_leaderboards()
+    
     async def get_citizen_rank(self, user_id: str, period: str = "weekly") -> Dict[str, Any]:
         """Get citizen's current rank"""
         try:
@@ -816,13 +1358,35 @@ class CitizenService:
                 await self.initialize()
             
             if self.database is None:
-                return {"rank": 3, "totalParticipants": 127, "percentile": 97.6}
+                return dict(_DEMO_RANK)
             
-            # TODO: Implement actual rank calculation
-            return {"rank": 0, "totalParticipants": 0, "percentile": 0}
+            user_oid = _to_oid(user_id)
+            if user_oid is None:
+                return dict(_DEMO_RANK)
+            
+            # The stored score only - get_citizen_by_id would pad a missing one with defaults
+            user = await self.database.users.find_one(
+                {"_id": user_oid, "role": "citizen"}, {"citizenProfile.totalPoints": 1}
+            )
+            if not user:
+                return {"rank": 0, "totalParticipants": 0, "percentile": 0}
+            points = (user.get("citizenProfile") or {}).get("totalPoints", 0)
+            
+            # Rank = 1 + citizens with more points - both counts are range scans of
+            # the partial citizen_pts_desc index, run concurrently
+            total, above = await asyncio.gather(
+                self.database.users.count_documents({**_CITIZEN_BASE_FILTER}),
+                self.database.users.count_documents(
+                    {**_CITIZEN_BASE_FILTER, "citizenProfile.totalPoints": {"$gt": points}}
+                )
+            )
+            rank = above + 1
+            total = max(total, rank)
+            
+            return {"rank": rank, "totalParticipants": total, "percentile": round((total - rank) / total * 100, 1)}
             
         except Exception as e:
-            print(f"âŒ Error getting citizen rank: {e}")
+            logger.error("❌ Error getting citizen rank: %s", e)
             return {"rank": 0, "totalParticipants": 0, "percentile": 0}
     
     # ===================
@@ -831,38 +1395,53 @@ class CitizenService:
     
     async def check_and_award_badges(self, user_id: str) -> List[str]:
         """Check for new badge achievements and award them"""
+        # Nothing that could earn a badge has changed since the last check
+        if user_id in _badge_check_cache:
+            return []
+        
+        # Concurrent checks for one user share a single run and its result
+        check = self._badge_inflight.get(user_id)
+        if check is None:
+            check = self._badge_inflight[user_id] = asyncio.create_task(self._award_badges(user_id))
+            check.add_done_callback(lambda _: self._badge_inflight.pop(user_id, None))
+        # Shielded: one caller going away must not cancel the others' check
+        return list(await asyncio.shield(check))
+    
+    async def _award_badges(self, user_id: str) -> List[str]:
         try:
-            user = await self.get_citizen_by_id(user_id)
-            if not user:
+            if self.database is None:
+                await self.initialize()
+            
+            user_oid = _to_oid(user_id)
+            if self.database is None or user_oid is None:
                 return []
             
-            current_badges = set(user["citizenProfile"].get("badges", []))
-            new_badges = []
-            
-            # Define badge criteria
-            badge_criteria = {
-                "first_report": lambda u: u["citizenProfile"]["totalReports"] >= 1,
-                "reporter_5": lambda u: u["citizenProfile"]["totalReports"] >= 5,
-                "reporter_10": lambda u: u["citizenProfile"]["totalReports"] >= 10,
-                "point_hunter_100": lambda u: u["citizenProfile"]["totalPoints"] >= 100,
-                "point_hunter_500": lambda u: u["citizenProfile"]["totalPoints"] >= 500,
-                "weekend_warrior": lambda u: True,  # TODO: Check if reported on weekend
-                "sharp_eye": lambda u: u["reputation"] >= 4.5,
-                "community_leader": lambda u: u["citizenProfile"]["totalReports"] >= 25,
-                "eco_champion": lambda u: u["citizenProfile"]["level"] == "eco_champion"
-            }
+            # Criteria are evaluated by the update itself - one round trip, and
+            # qualifying badges are appended (in rule order) only if missing
+            before = await self._users_fast.find_one_and_update(
+                {"_id": user_oid, "role": "citizen"},
+                _badge_award_stages(_EARNED_BADGES_EXPR, datetime.utcnow()),
+                projection=_BADGE_FIELDS_PROJECTION,
+                return_document=ReturnDocument.BEFORE
+            )
+            if before is None:
+                return []
+            
+            # Same rules on the pre-image: what the update just added
+            current_badges = set(before.get("citizenProfile", {}).get("badges", []))
+            new_badges = [badge_id for badge_id in _earned_badges(before) if badge_id not in current_badges]
+            for badge_id in new_badges:
+                logger.info("🏆 New badge awarded: %s", badge_id)
             
-            # Check each badge criteria
-            for badge_id, criteria_func in badge_criteria.items():
-                if badge_id not in current_badges and criteria_func(user):
-                    await self.add_citizen_badge(user_id, badge_id)
-                    new_badges.append(badge_id)
-                    print(f"ðŸ† New badge awarded: {badge_id}")
+            if new_badges:
+                invalidate_user_cache(user_id)
             
+            # Set after the invalidation above, so this check's own write does not undo it
+            _badge_check_cache[user_id] = True
             return new_badges
             
         except Exception as e:
-            print(f"âŒ Error checking badges: {e}")
+            logger.error("❌ Error checking badges: %s", e)
             return []
     
     # ===================
@@ -878,13 +1457,18 @@ class CitizenService:
             if self.database is None:
                 return []
             
+            # Case-insensitive prefix match as a range under the *_ci index collation
+            # ($regex ignores collation, so it could never use those indexes);
+            # U+FFFF sorts after every character
+            query = query.strip()
+            prefix = {"$gte": query, "$lt": query + "\uffff"}
+            
             search_filter = {
-                "role": "citizen",
-                "isActive": True,
+                **_CITIZEN_BASE_FILTER,
                 "$or": [
-                    {"fullName": {"$regex": query, "$options": "i"}},
-                    {"location.city": {"$regex": query, "$options": "i"}},
-                    {"location.state": {"$regex": query, "$options": "i"}}
+                    {"fullName": prefix},
+                    {"location.city": prefix},
+                    {"location.state": prefix}
                 ]
             }
             
@@ -897,24 +1481,25 @@ class CitizenService:
                 if "location" in filters:
                     search_filter["location.city"] = filters["location"]
             
-            cursor = self.database.users.find(search_filter).limit(20)
-            citizens = []
+            # Capped result - one batch, one await, then reshape in plain Python
+            cursor = self.database.users.find(search_filter, projection=_CITIZEN_SEARCH_PROJECTION)
+            cursor = cursor.collation(CASE_INSENSITIVE_COLLATION).limit(_SEARCH_LIMIT).batch_size(_SEARCH_LIMIT)
+            users = await cursor.to_list(length=_SEARCH_LIMIT)
             
-            async for user in cursor:
-                user["_id"] = str(user["_id"])
-                citizens.append({
-                    "userId": user["_id"],
+            return [
+                {
+                    "userId": str(user["_id"]),
                     "fullName": user["fullName"],
                     "location": user["location"],
                     "level": user["citizenProfile"]["level"],
                     "points": user["citizenProfile"]["totalPoints"],
                     "reputation": user["reputation"]
-                })
-            
-            return citizens
+                }
+                for user in users
+            ]
             
         except Exception as e:
-            print(f"âŒ Error searching citizens: {e}")
+            logger.error("❌ Error searching citizens: %s", e)
             return []
     
     async def get_citizen_activity_feed(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
@@ -922,41 +1507,12 @@ class CitizenService:
         try:
             # TODO: Implement actual activity feed from database
             # This would include: reports submitted, badges earned, level ups, etc.
+            # Apply $limit before any per-activity enrichment stages.
             
-            demo_activities = [
-                {
-                    "id": "act_001",
-                    "type": "report_submitted",
-                    "title": "Waste Report Submitted",
-                    "description": "Plastic waste reported at Park Street",
-                    "timestamp": "2025-01-20T10:30:00Z",
-                    "points": 25,
-                    "icon": "ðŸ“"
-                },
-                {
-                    "id": "act_002", 
-                    "type": "badge_earned",
-                    "title": "Badge Unlocked!",
-                    "description": "Earned 'Sharp Eye' badge",
-                    "timestamp": "2025-01-19T15:45:00Z",
-                    "points": 50,
-                    "icon": "ðŸ†"
-                },
-                {
-                    "id": "act_003",
-                    "type": "level_up",
-                    "title": "Level Up!",
-                    "description": "Advanced to Eco Warrior level",
-                    "timestamp": "2025-01-18T12:00:00Z",
-                    "points": 0,
-                    "icon": "â¬†ï¸"
-                }
-            ]
-            
-            return demo_activities[:limit]
+            return list(_DEMO_ACTIVITIES[:limit])
             
         except Exception as e:
-            print(f"âŒ Error getting activity feed: {e}")
+            logger.error("❌ Error getting activity feed: %s", e)
             return []
     
     # ===================
@@ -975,20 +1531,19 @@ class CitizenService:
             # Email validation
             email = data.get("email", "")
             if email:
-                import re
-                if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', email):
+                if not _EMAIL_RE.fullmatch(email):
                     errors.append("Invalid email format")
             
             # Phone validation
             phone = data.get("phone", "")
             if phone:
-                if not re.match(r'^\+91-\d{10}, phone'):
+                if not _PHONE_RE.fullmatch(phone):
                     errors.append("Phone must be in format +91-XXXXXXXXXX")
             
             # Location validation
             location = data.get("location", {})
             if location:
-                if location.get("pincode") and not re.match(r'^\d{6}, location["pincode"]'):
+                if location.get("pincode") and not _PINCODE_RE.fullmatch(location["pincode"]):
                     errors.append("Pincode must be 6 digits")
             
             return len(errors) == 0, errors
@@ -3,13 +3,147 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 import random
+import re
 import uuid
 import math
 
+import numpy as np
+
 from .database import get_database
 from .config import settings
 
+# Area names are folded to this slug in bin ids - the full name, so two areas
+# sharing a prefix ("Gandhi Nagar" / "Gandhipuram") never share ids
+_NON_ID_CHARS = re.compile(r"[^A-Z0-9]+")
+
+# Status urgency points of the priority score (0-20)
+_STATUS_SCORES = {
+    "overflowing": 20,
+    "needs_collection": 15,
+    "normal": 5,
+    "maintenance": 0
+}
+
+# Earnings bonuses by bin type and by status
+_TYPE_BONUS = {
+    "commercial": 50,
+    "medical": 100,
+    "office": 30,
+    "residential": 0
+}
+_URGENCY_BONUS = {
+    "overflowing": 100,
+    "needs_collection": 50,
+    "normal": 0
+}
+
+# Aggregation twins of _score_bins_batch / _calculate_real_earnings, so the
+# priority query can score and sort on the server
+def _table_expr(field: str, table: Dict[str, int], default: str, missing: int) -> Dict[str, Any]:
+    """$switch looking up a field's value in a score table"""
+    value = {"$ifNull": [field, default]}
+    return {"$switch": {
+        "branches": [{"case": {"$eq": [value, key]}, "then": points} for key, points in table.items()],
+        "default": missing
+    }}
+
+def _priority_score_expr(now: datetime) -> Dict[str, Any]:
+    hours_since = {"$divide": [{"$subtract": [now, "$last_collection_time"]}, 3_600_000]}
+    return {"$round": [{"$add": [
+        # Fill level priority (0-40 points)
+        {"$multiply": [{"$divide": [{"$ifNull": ["$current_fill_level", 0]}, 100]}, 40]},
+        # Time since last collection (0-30 points), never collected = 30
+        {"$cond": [
+            {"$ifNull": ["$last_collection_time", False]},
+            {"$min": [30, {"$multiply": [{"$divide": [hours_since, 24]}, 10]}]},
+            30
+        ]},
+        # Status urgency (0-20 points)
+        _table_expr("$status", _STATUS_SCORES, "normal", 5),
+        # Historical average (0-10 points)
+        {"$min": [10, {"$divide": [{"$ifNull": ["$analytics.avg_daily_waste", 0]}, 5]}]}
+    ]}, 2]}
+
+_EARNINGS_EXPR = {"$toInt": {"$round": [{"$add": [
+    150,  # base pay
+    {"$max": [0, {"$multiply": [{"$subtract": [{"$ifNull": ["$current_fill_level", 0]}, 50]}, 2]}]},
+    _table_expr("$bin_type", _TYPE_BONUS, "residential", 0),
+    _table_expr("$status", _URGENCY_BONUS, "normal", 0)
+]}, 0]}}
+
+# Random source for the vectorized bin coordinate generation
+_rng = np.random.default_rng()
+
+# Keyword classifiers - one case-insensitive substring scan per category, tried in
+# order (first match wins), same keywords the helpers used to test one by one
+def _keywords(*words: str) -> re.Pattern:
+    return re.compile("|".join(words), re.IGNORECASE)
+
+# Area type -> (min, max) bins
+_AREA_BIN_COUNTS = (
+    (_keywords("market", "commercial", "business", "shopping"), (15, 25)),  # Commercial areas need more bins
+    (_keywords("residential", "colony", "nagar", "layout"), (8, 15)),       # Residential areas
+    (_keywords("it", "tech", "park", "office"), (12, 20)),                   # IT/Tech areas
+    (_keywords("hospital", "school", "college", "university"), (10, 18)),  # Institutional areas
+)
+_DEFAULT_BIN_COUNT = (10, 16)  # Default for mixed areas
+
+# Landmark -> (bin type, capacity liters, waste types, collection frequency)
+_LANDMARK_BIN_SPECS = (
+    # High-capacity commercial bins
+    (_keywords("market", "shopping", "complex", "restaurant"),
+     ("commercial", 1100, ["mixed", "plastic", "organic", "paper"], "twice_daily")),
+    # Specialized bins
+    (_keywords("hospital", "medical"),
+     ("medical", 660, ["medical", "hazardous", "mixed"], "daily")),
+    (_keywords("office", "building", "it", "tech"),
+     ("office", 880, ["paper", "plastic", "e_waste", "mixed"], "daily")),
+)
+# Standard residential bins
+_DEFAULT_BIN_SPEC = ("residential", 660, ["mixed", "organic", "plastic"], "alternate_days")
+
+# Landmark -> peak waste generation hours
+_LANDMARK_PEAK_HOURS = (
+    (_keywords("market", "shopping"), ["10:00-12:00", "16:00-19:00"]),   # Shopping hours
+    (_keywords("office", "building"), ["12:00-14:00", "18:00-20:00"]),   # Lunch and evening
+    (_keywords("school", "college"), ["11:00-13:00", "15:00-17:00"]),    # Break times
+    (_keywords("restaurant", "hotel"), ["13:00-15:00", "20:00-22:00"]),  # Meal times
+)
+_DEFAULT_PEAK_HOURS = ["08:00-10:00", "18:00-20:00"]  # General residential
+
+def _bin_spec_for(landmark: str) -> Tuple[str, int, List[str], str]:
+    """First matching _LANDMARK_BIN_SPECS entry (shared lists - copy before storing)"""
+    for pattern, spec in _LANDMARK_BIN_SPECS:
+        if pattern.search(landmark):
+            return spec
+    return _DEFAULT_BIN_SPEC
+
+def _peak_hours_for(landmark: str) -> List[str]:
+    """First matching _LANDMARK_PEAK_HOURS entry (shared list - copy before storing)"""
+    for pattern, hours in _LANDMARK_PEAK_HOURS:
+        if pattern.search(landmark):
+            return hours
+    return _DEFAULT_PEAK_HOURS
+
+# Common landmark types for different areas
+_LANDMARK_TEMPLATES = (
+    # Residential landmarks
+    {"type": "residential", "names": ("Main Road Junction", "Community Center", "Local Market", "Bus Stop", "Temple Corner", "School Gate", "Apartment Complex", "Park Entrance")},
+    # Commercial landmarks
+    {"type": "commercial", "names": ("Shopping Complex", "Bank ATM", "Medical Store", "Restaurant Corner", "Office Building", "Petrol Pump", "Auto Stand", "Market Entrance")},
+    # Public landmarks
+    {"type": "public", "names": ("Government Office", "Police Station", "Post Office", "Railway Station", "Bus Terminal", "Hospital Gate", "Park Corner", "Stadium Entrance")},
+)
+
+# Bin spec and peak hours of every template landmark, classified once at import
+_BIN_PROFILE_BY_LANDMARK = {
+    name: (_bin_spec_for(name), _peak_hours_for(name))
+    for category in _LANDMARK_TEMPLATES
+    for name in category["names"]
+}
+
 class BinManagementService:
     """Smart Bin Management with Auto-Generation for New Areas"""
     
@@ -71,10 +205,12 @@ class BinManagementService:
         bin_locations = self._generate_bin_locations(worker_location, bin_count)
         
         generated_bins = []
+        now = datetime.utcnow()
+        area_slug = _NON_ID_CHARS.sub("", area.upper())
         
         for i, location in enumerate(bin_locations):
             bin_data = {
-                "bin_id": f"BIN_{city.upper()}_{area.replace(' ', '')[:3].upper()}_{str(i+1).zfill(3)}",
+                "bin_id": f"BIN_{city.upper()}_{area_slug}_{str(i+1).zfill(3)}",
                 "location": {
                     "area": area,
                     "city": city,
@@ -101,8 +237,8 @@ class BinManagementService:
                 },
                 "maintenance": {
                     "condition": "good",  # New bins start in good condition
-                    "last_maintenance": datetime.utcnow(),
-                    "next_maintenance": datetime.utcnow() + timedelta(days=180)  # 6 months
+                    "last_maintenance": now,
+                    "next_maintenance": now + timedelta(days=180)  # 6 months
                 },
                 "analytics": {
                     "avg_daily_waste": 0,  # Will be calculated from actual data
@@ -111,8 +247,8 @@ class BinManagementService:
                     "total_collections": 0,
                     "total_waste_collected": 0
                 },
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
+                "created_at": now,
+                "updated_at": now,
                 "assigned_workers": [],  # Will be assigned dynamically
                 "collection_history": []  # Starts empty, builds from real collections
             }
@@ -121,26 +257,23 @@ class BinManagementService:
         
         # Insert into database
         if generated_bins:
-            await self.bins_collection.insert_many(generated_bins)
-            print(f"✅ Inserted {len(generated_bins)} bins into database")
+            # Unordered: a bin_id that already exists (unique index) skips only that bin
+            try:
+                await self.bins_collection.insert_many(generated_bins, ordered=False)
+            except BulkWriteError as e:
+                failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                print(f"⚠️ Skipped {len(failed)} bins that already exist (duplicate bin_id)")
+                generated_bins = [bin_data for i, bin_data in enumerate(generated_bins) if i not in failed]
+            print(f"✅ Inserted {len(generated_bins)} bins")
         
         return generated_bins
     
     def _calculate_optimal_bin_count(self, area: str) -> int:
         """Calculate optimal number of bins based on area type"""
-        area_lower = area.lower()
-        
-        # Area type classification
-        if any(word in area_lower for word in ["market", "commercial", "business", "shopping"]):
-            return random.randint(15, 25)  # Commercial areas need more bins
-        elif any(word in area_lower for word in ["residential", "colony", "nagar", "layout"]):
-            return random.randint(8, 15)   # Residential areas
-        elif any(word in area_lower for word in ["it", "tech", "park", "office"]):
-            return random.randint(12, 20)  # IT/Tech areas
-        elif any(word in area_lower for word in ["hospital", "school", "college", "university"]):
-            return random.randint(10, 18)  # Institutional areas
-        else:
-            return random.randint(10, 16)  # Default for mixed areas
+        for pattern, (low, high) in _AREA_BIN_COUNTS:
+            if pattern.search(area):
+                return random.randint(low, high)
+        return random.randint(*_DEFAULT_BIN_COUNT)
     
     def _generate_bin_locations(self, worker_location: Dict, bin_count: int) -> List[Dict[str, Any]]:
         """Generate realistic bin locations within area"""
@@ -150,102 +283,39 @@ class BinManagementService:
         
         locations = []
         
-        # Common landmark types for different areas
-        landmark_templates = [
-            # Residential landmarks
-            {"type": "residential", "names": ["Main Road Junction", "Community Center", "Local Market", "Bus Stop", "Temple Corner", "School Gate", "Apartment Complex", "Park Entrance"]},
-            # Commercial landmarks  
-            {"type": "commercial", "names": ["Shopping Complex", "Bank ATM", "Medical Store", "Restaurant Corner", "Office Building", "Petrol Pump", "Auto Stand", "Market Entrance"]},
-            # Public landmarks
-            {"type": "public", "names": ["Government Office", "Police Station", "Post Office", "Railway Station", "Bus Terminal", "Hospital Gate", "Park Corner", "Stadium Entrance"]}
-        ]
+        # Coordinates for every bin at once, within 2km radius of worker location
+        angles = _rng.uniform(0, 2 * np.pi, bin_count)
+        distances = _rng.uniform(0.2, 2.0, bin_count)  # 200m to 2km radius
+        base_cos = math.cos(math.radians(base_lat))
         
-        for i in range(bin_count):
-            # Generate coordinates within 2km radius of worker location
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(0.2, 2.0)  # 200m to 2km radius
-            
-            lat_offset = (distance / 111.0) * math.cos(angle)  # 1 degree lat ≈ 111km
-            lng_offset = (distance / (111.0 * math.cos(math.radians(base_lat)))) * math.sin(angle)
-            
+        latitudes = (base_lat + (distances / 111.0) * np.cos(angles)).tolist()  # 1 degree lat ≈ 111km
+        longitudes = (base_lng + (distances / (111.0 * base_cos)) * np.sin(angles)).tolist()
+        
+        for latitude, longitude in zip(latitudes, longitudes):
             # Select landmark based on area type
-            landmark_category = random.choice(landmark_templates)
+            landmark_category = random.choice(_LANDMARK_TEMPLATES)
             landmark = random.choice(landmark_category["names"])
             
-            # Determine bin specifications
-            bin_type, capacity, waste_types, frequency = self._determine_bin_specifications(landmark)
+            # Bin specifications, precomputed per template landmark
+            (bin_type, capacity, waste_types, frequency), peak_hours = _BIN_PROFILE_BY_LANDMARK[landmark]
             
             location = {
                 "landmark": f"{landmark} - {area}",
-                "latitude": base_lat + lat_offset,
-                "longitude": base_lng + lng_offset,
+                "latitude": latitude,
+                "longitude": longitude,
                 "bin_type": bin_type,
                 "capacity": capacity,
-                "waste_types": waste_types,
+                "waste_types": list(waste_types),
                 "collection_frequency": frequency,
                 "vehicle_access": random.choice([True, True, False]),  # 66% vehicle accessible
                 "difficulty": random.choice(["easy", "easy", "medium", "hard"]),
-                "peak_hours": self._generate_peak_hours(landmark)
+                "peak_hours": list(peak_hours)
             }
             
             locations.append(location)
         
         return locations
     
-    def _determine_bin_specifications(self, landmark: str) -> Tuple[str, int, List[str], str]:
-        """Determine bin type and specifications based on landmark"""
-        landmark_lower = landmark.lower()
-        
-        # High-capacity commercial bins
-        if any(word in landmark_lower for word in ["market", "shopping", "complex", "restaurant"]):
-            return (
-                "commercial",
-                1100,  # liters
-                ["mixed", "plastic", "organic", "paper"],
-                "twice_daily"
-            )
-        
-        # Specialized bins
-        elif any(word in landmark_lower for word in ["hospital", "medical"]):
-            return (
-                "medical",
-                660,
-                ["medical", "hazardous", "mixed"],
-                "daily"
-            )
-        
-        elif any(word in landmark_lower for word in ["office", "building", "it", "tech"]):
-            return (
-                "office",
-                880,
-                ["paper", "plastic", "e_waste", "mixed"],
-                "daily"
-            )
-        
-        # Standard residential bins
-        else:
-            return (
-                "residential",
-                660,
-                ["mixed", "organic", "plastic"],
-                "alternate_days"
-            )
-    
-    def _generate_peak_hours(self, landmark: str) -> List[str]:
-        """Generate peak waste generation hours based on landmark type"""
-        landmark_lower = landmark.lower()
-        
-        if any(word in landmark_lower for word in ["market", "shopping"]):
-            return ["10:00-12:00", "16:00-19:00"]  # Shopping hours
-        elif any(word in landmark_lower for word in ["office", "building"]):
-            return ["12:00-14:00", "18:00-20:00"]  # Lunch and evening
-        elif any(word in landmark_lower for word in ["school", "college"]):
-            return ["11:00-13:00", "15:00-17:00"]  # Break times
-        elif any(word in landmark_lower for word in ["restaurant", "hotel"]):
-            return ["13:00-15:00", "20:00-22:00"]  # Meal times
-        else:
-            return ["08:00-10:00", "18:00-20:00"]  # General residential
-    
     # ===================
     # REAL-TIME BIN UPDATES (Dynamic from actual usage)
     # ===================
@@ -321,30 +391,27 @@ class BinManagementService:
     async def _recalculate_bin_analytics(self, bin_id: str):
         """Recalculate analytics from REAL collection history"""
         try:
-            bin_data = await self.bins_collection.find_one({"bin_id": bin_id})
-            if not bin_data:
-                return
-            
-            history = bin_data.get("collection_history", [])
-            if not history:
-                return
-            
-            # Calculate REAL average daily waste from history
-            if len(history) > 1:
-                total_days = (history[0]["collection_time"] - history[-1]["collection_time"]).days
-                total_waste = sum([h["waste_collected_kg"] for h in history])
-                avg_daily_waste = total_waste / max(total_days, 1)
-            else:
-                avg_daily_waste = history[0]["waste_collected_kg"] if history else 0
-            
-            # Update with REAL calculated data
+            history = "$collection_history"
+            span_days = {"$abs": {"$dateDiff": {
+                "startDate": {"$arrayElemAt": [f"{history}.collection_time", 0]},
+                "endDate": {"$arrayElemAt": [f"{history}.collection_time", -1]},
+                "unit": "day"
+            }}}
+            
+            # REAL average daily waste, computed server-side from the stored history -
+            # one round trip, no history shipped to Python (bins without history untouched)
             await self.bins_collection.update_one(
-                {"bin_id": bin_id},
-                {
-                    "$set": {
-                        "analytics.avg_daily_waste": round(avg_daily_waste, 2)
-                    }
-                }
+                {"bin_id": bin_id, "collection_history.0": {"$exists": True}},
+                [{"$set": {
+                    "analytics.avg_daily_waste": {"$round": [
+                        {"$cond": [
+                            {"$gt": [{"$size": history}, 1]},
+                            {"$divide": [{"$sum": f"{history}.waste_collected_kg"}, {"$max": [span_days, 1]}]},
+                            {"$arrayElemAt": [f"{history}.waste_collected_kg", 0]}
+                        ]},
+                        2
+                    ]}
+                }}]
             )
             
         except Exception as e:
@@ -361,31 +428,34 @@ class BinManagementService:
             
             area = worker_location.get("area")
             city = worker_location.get("city")
-            
-            # Get bins that ACTUALLY need collection
-            priority_bins = await self.bins_collection.find({
-                "location.area": area,
-                "location.city": city,
-                "$or": [
-                    {"current_fill_level": {"$gte": 75}},  # 75%+ full
-                    {"status": "needs_collection"},
-                    {"status": "overflowing"},
-                    {
-                        "last_collection_time": {
-                            "$lt": datetime.utcnow() - timedelta(days=2)  # Not collected in 2 days
+            now = datetime.utcnow()
+            
+            # Get bins that ACTUALLY need collection, scored and sorted by REAL priority
+            # on the server
+            pipeline = [
+                {"$match": {
+                    "location.area": area,
+                    "location.city": city,
+                    "$or": [
+                        {"current_fill_level": {"$gte": 75}},  # 75%+ full
+                        {"status": "needs_collection"},
+                        {"status": "overflowing"},
+                        {
+                            "last_collection_time": {
+                                "$lt": now - timedelta(days=2)  # Not collected in 2 days
+                            }
                         }
-                    }
-                ]
-            }).to_list(length=50)
-            
-            # Calculate REAL priority scores
-            for bin_data in priority_bins:
-                bin_data["_id"] = str(bin_data["_id"])
-                bin_data["priority_score"] = self._calculate_real_priority(bin_data)
-                bin_data["estimated_earnings"] = self._calculate_real_earnings(bin_data)
-            
-            # Sort by REAL priority
-            priority_bins.sort(key=lambda x: x["priority_score"], reverse=True)
+                    ]
+                }},
+                {"$addFields": {
+                    "_id": {"$toString": "$_id"},
+                    "priority_score": _priority_score_expr(now),
+                    "estimated_earnings": _EARNINGS_EXPR
+                }},
+                {"$sort": {"priority_score": -1}},
+                {"$limit": 50}
+            ]
+            priority_bins = await self.bins_collection.aggregate(pipeline).to_list(length=50)
             
             return priority_bins
             
@@ -393,37 +463,27 @@ class BinManagementService:
             print(f"❌ Error getting priority bins: {e}")
             return []
     
-    def _calculate_real_priority(self, bin_data: Dict) -> float:
-        """Calculate REAL priority based on actual data"""
-        score = 0.0
-        
-        # Fill level priority (0-40 points)
-        fill_level = bin_data.get("current_fill_level", 0)
-        score += (fill_level / 100) * 40
-        
-        # Time since last collection (0-30 points)
-        last_collection = bin_data.get("last_collection_time")
-        if last_collection:
-            hours_since = (datetime.utcnow() - last_collection).total_seconds() / 3600
-            score += min(30, hours_since / 24 * 10)  # Up to 30 points for 3+ days
-        else:
-            score += 30  # Never collected = high priority
+    def _score_bins_batch(self, bins: List[Dict], now: Optional[datetime] = None) -> List[float]:
+        """REAL priority (0-100) of a list of bins in one vectorized pass"""
+        if not bins:
+            return []
+        if now is None:
+            now = datetime.utcnow()
         
-        # Status urgency (0-20 points)
-        status = bin_data.get("status", "normal")
-        status_scores = {
-            "overflowing": 20,
-            "needs_collection": 15,
-            "normal": 5,
-            "maintenance": 0
-        }
-        score += status_scores.get(status, 5)
+        fill = np.array([b.get("current_fill_level", 0) for b in bins], dtype=float)
+        hours_since = np.array([
+            (now - b["last_collection_time"]).total_seconds() / 3600 if b.get("last_collection_time") else np.nan
+            for b in bins
+        ])
+        status = np.array([_STATUS_SCORES.get(b.get("status", "normal"), 5) for b in bins], dtype=float)
+        avg_daily = np.array([b.get("analytics", {}).get("avg_daily_waste", 0) for b in bins], dtype=float)
         
-        # Historical average (0-10 points)
-        avg_daily = bin_data.get("analytics", {}).get("avg_daily_waste", 0)
-        score += min(10, avg_daily / 5)  # Higher for historically high-waste bins
+        # Never collected = full 30 time points
+        time_score = np.where(np.isnan(hours_since), 30, np.minimum(30, hours_since / 24 * 10))
         
-        return round(score, 2)
+        # Fill level (0-40) + time since collection (0-30) + status (0-20) + history (0-10)
+        score = (fill / 100) * 40 + time_score + status + np.minimum(10, avg_daily / 5)
+        return np.round(score, 2).tolist()
     
     def _calculate_real_earnings(self, bin_data: Dict) -> int:
         """Calculate REAL earnings potential"""
@@ -435,20 +495,11 @@ class BinManagementService:
         
         # Bin type bonus
         bin_type = bin_data.get("bin_type", "residential")
-        type_bonus = {
-            "commercial": 50,
-            "medical": 100,
-            "office": 30,
-            "residential": 0
-        }.get(bin_type, 0)
+        type_bonus = _TYPE_BONUS.get(bin_type, 0)
         
         # Urgency bonus
         status = bin_data.get("status", "normal")
-        urgency_bonus = {
-            "overflowing": 100,
-            "needs_collection": 50,
-            "normal": 0
-        }.get(status, 0)
+        urgency_bonus = _URGENCY_BONUS.get(status, 0)
         
         total = base_pay + fill_bonus + type_bonus + urgency_bonus
         return round(total)
@@ -457,22 +508,29 @@ class BinManagementService:
     # BIN RETRIEVAL OPERATIONS
     # ===================
     
-    async def get_bins_in_area(self, area: str, city: str) -> List[Dict[str, Any]]:
-        """Get all bins in specific area"""
+    async def get_bins_in_area(self, area: str, city: str, waste_types: Optional[frozenset] = None) -> List[Dict[str, Any]]:
+        """Get all bins in specific area (only those taking any of waste_types, if given)"""
         try:
             await self._ensure_db_connection()
             
-            bins = await self.bins_collection.find({
+            query = {
                 "location.area": area,
                 "location.city": city
-            }).to_list(length=100)
+            }
+            if waste_types is not None:
+                query["waste_types"] = {"$in": sorted(waste_types)}
+            
+            bins = await self.bins_collection.find(query).to_list(length=100)
             
-            # Convert ObjectIds and add real-time data
-            for bin_data in bins:
+            # Convert ObjectIds and add real-time data (priorities scored as one batch)
+            now = datetime.utcnow()
+            scores = self._score_bins_batch(bins, now)
+            for bin_data, score in zip(bins, scores):
                 bin_data["_id"] = str(bin_data["_id"])
-                bin_data["heat_level"] = self._calculate_heat_level(bin_data)
+                bin_data["priority_score"] = score
+                bin_data["heat_level"] = self._calculate_heat_level(bin_data, now)
                 bin_data["estimated_earnings"] = self._calculate_collection_earnings(bin_data)
-                bin_data["collection_urgency"] = self._calculate_urgency(bin_data)
+                bin_data["collection_urgency"] = self._urgency_from_score(score)
             
             return bins
             
@@ -494,23 +552,21 @@ class BinManagementService:
             worker_area = worker_location.get("area")
             worker_city = worker_location.get("city")
             
-            # Get bins in same area first
-            bins = await self.get_bins_in_area(worker_area, worker_city)
-            
-            # Filter by additional criteria
-            suitable_bins = []
-            for bin_data in bins:
-                if self._is_bin_suitable_for_worker(bin_data, worker):
-                    suitable_bins.append(bin_data)
-            
-            return suitable_bins
+            # Bins in the same area that take any waste type the worker handles -
+            # filtered by Mongo, so rejected bins are never fetched or scored
+            specializations = frozenset(worker.get("workerProfile", {}).get("specializations", []))
+            if not specializations:
+                return []
+            return await self.get_bins_in_area(worker_area, worker_city, waste_types=specializations)
             
         except Exception as e:
             print(f"❌ Error getting bins for worker: {e}")
             return []
     
-    def _calculate_heat_level(self, bin_data: Dict) -> str:
+    def _calculate_heat_level(self, bin_data: Dict, now: Optional[datetime] = None) -> str:
         """Calculate heat map level for visualization"""
+        if now is None:
+            now = datetime.utcnow()
         fill_level = bin_data.get("current_fill_level", 0)
         last_collection = bin_data.get("last_collection_time")
         status = bin_data.get("status", "normal")
@@ -521,7 +577,7 @@ class BinManagementService:
         
         # Time-based calculation
         if last_collection:
-            hours_since = (datetime.utcnow() - last_collection).total_seconds() / 3600
+            hours_since = (now - last_collection).total_seconds() / 3600
             
             # Red: Very urgent (high fill + time)
             if fill_level > 80 or hours_since > 48:
@@ -545,10 +601,8 @@ class BinManagementService:
         """Calculate earnings for bin collection"""
         return self._calculate_real_earnings(bin_data)
     
-    def _calculate_urgency(self, bin_data: Dict) -> str:
-        """Calculate collection urgency level"""
-        priority_score = self._calculate_real_priority(bin_data)
-        
+    def _urgency_from_score(self, priority_score: float) -> str:
+        """Urgency level for a priority score"""
         if priority_score >= 70:
             return "critical"
         elif priority_score >= 50:
@@ -557,14 +611,6 @@ class BinManagementService:
             return "medium"
         else:
             return "low"
-    
-    def _is_bin_suitable_for_worker(self, bin_data: Dict, worker: Dict) -> bool:
-        """Check if bin is suitable for worker's specializations"""
-        worker_specializations = worker.get("workerProfile", {}).get("specializations", [])
-        bin_waste_types = bin_data.get("waste_types", [])
-        
-        # Check if worker can handle any of the bin's waste types
-        return any(waste_type in worker_specializations for waste_type in bin_waste_types)
 
 # Create global service instance
 bin_management_service = BinManagementService()
\ No newline at end of file
@@ -33,6 +33,7 @@ class Settings(BaseSettings):
     cloudinary_cloud_name: Optional[str] = Field(default=None, env="CLOUDINARY_CLOUD_NAME")
     cloudinary_api_key: Optional[str] = Field(default=None, env="CLOUDINARY_API_KEY")
     cloudinary_api_secret: Optional[str] = Field(default=None, env="CLOUDINARY_API_SECRET")
+    cloudinary_webhook_url: Optional[str] = Field(default=None, env="CLOUDINARY_WEBHOOK_URL")
     
     # Communication (optional)
     twilio_account_sid: Optional[str] = Field(default=None, env="TWILIO_ACCOUNT_SID")
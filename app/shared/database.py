@@ -1,13 +1,17 @@
 # app/shared/database.py - Database Connection (Matches your existing system)
 
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
 from pymongo.errors import ConnectionFailure
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Case-insensitive collation of the citizen search indexes - queries must pass the
+# same collation to use them
+CASE_INSENSITIVE_COLLATION = {"locale": "en", "strength": 2}
+
 class Database:
     """MongoDB Database Manager - Matches your existing system"""
     
@@ -15,6 +19,11 @@ class Database:
         self.client: AsyncIOMotorClient = None
         self.database: AsyncIOMotorDatabase = None
         self.is_connected = False
+        # Hot-path shortcuts, only touched on connect/disconnect:
+        # `ready` replaces the hasattr/is_connected/is-not-None chain and
+        # `requests` is the service requests collection handle
+        self.ready = False
+        self.requests: AsyncIOMotorCollection = None
     
     async def connect_to_database(self):
         """Create database connection"""
@@ -36,6 +45,8 @@ class Database:
             await self.client.admin.command('ping')
             self.database = self.client[database_name]
             self.is_connected = True
+            self.requests = self.database.requests
+            self.ready = True
             
             logger.info(f"✅ Connected to MongoDB database: {database_name}")
             
@@ -47,11 +58,15 @@ class Database:
             logger.info("🔄 Continuing in demo mode without database...")
             self.database = None
             self.is_connected = False
+            self.requests = None
+            self.ready = False
         except Exception as e:
             logger.error(f"❌ Database connection error: {e}")
             logger.info("🔄 Continuing in demo mode without database...")
             self.database = None
             self.is_connected = False
+            self.requests = None
+            self.ready = False
     
     async def close_database_connection(self):
         """Close database connection"""
@@ -59,21 +74,49 @@ class Database:
             logger.info("🔌 Closing MongoDB connection...")
             self.client.close()
             self.is_connected = False
+            self.ready = False
             logger.info("✅ MongoDB connection closed")
     
     async def create_indexes(self):
         """Create database indexes for better performance"""
         try:
-            if not self.database:
+            if self.database is None:
                 return
                 
-            # Users collection indexes
-            await self.database.users.create_index("email", unique=True)
-            await self.database.users.create_index("phone", unique=True)
+            # Service requests collection indexes - the citizen pages rely on them:
+            #   (user_id, created_at desc, _id desc) -> my-requests find().sort().limit() and the
+            #                                     reports API keyset pages, both as index range scans
+            #   (user_id, status)                 -> statistics $match/$group
+            await self.database.requests.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+            await self.database.requests.create_index([("user_id", 1), ("status", 1)])
+            
+            # Users collection indexes (unique email/phone are built last, see below)
             await self.database.users.create_index("role")
             await self.database.users.create_index("isActive")
             await self.database.users.create_index([("location.city", 1), ("location.pincode", 1)])
             
+            # Citizen search - case-insensitive prefix ranges on name, city and state
+            for field, name in (("fullName", "fullName_ci"), ("location.city", "city_ci"), ("location.state", "state_ci")):
+                await self.database.users.create_index(field, collation=CASE_INSENSITIVE_COLLATION, name=name)
+            
+            # Leaderboard / rank sort keys over active citizens only (partial, so the
+            # index stays small): find(active citizens).sort(points desc).limit(n) and the
+            # "more points than me" rank count become bounded index walks
+            active_citizens = {"role": "citizen", "isActive": True}
+            await self.database.users.create_index(
+                [("role", 1), ("isActive", 1), ("citizenProfile.totalPoints", -1)],
+                partialFilterExpression=active_citizens,
+                name="citizen_pts_desc"
+            )
+            await self.database.users.create_index(
+                [("role", 1), ("isActive", 1), ("citizenProfile.totalReports", -1)],
+                partialFilterExpression=active_citizens,
+                name="citizen_reports_desc"
+            )
+            
+            # Points history - the weekly/monthly leaderboards sum a timestamp window
+            await self.database.points_transactions.create_index("timestamp")
+            
             # User requests collection indexes (for Mithra AI requests)
             await self.database.user_requests.create_index("user_id")
             await self.database.user_requests.create_index("requests.req_id")
@@ -93,6 +136,29 @@ class Database:
             await self.database.service_areas.create_index([("city", 1), ("pincode", 1)])
             await self.database.service_areas.create_index("serviceAvailable")
             
+            # Bins collection - per-area lookups: the priority query's fill/status branches
+            # (fullest first) and its "not collected lately" branch, plus the area listing
+            await self.database.bins.create_index(
+                [("location.city", 1), ("location.area", 1), ("status", 1), ("current_fill_level", -1)]
+            )
+            await self.database.bins.create_index(
+                [("location.city", 1), ("location.area", 1), ("last_collection_time", 1)]
+            )
+            # Multikey - a worker's bins: area + any of their specializations
+            await self.database.bins.create_index(
+                [("location.city", 1), ("location.area", 1), ("waste_types", 1)]
+            )
+            
+            # Unique indexes last, each on its own - they fail on existing null/duplicate
+            # data and must not block the others. bin_id lets unordered seed inserts
+            # skip duplicate bins
+            for collection, field in ((self.database.users, "email"), (self.database.users, "phone"),
+                                      (self.database.bins, "bin_id")):
+                try:
+                    await collection.create_index(field, unique=True)
+                except Exception as e:
+                    logger.warning(f"⚠️ Unique {collection.name}.{field} index not created: {e}")
+            
             logger.info("✅ Database indexes created successfully")
             
         except Exception as e:
@@ -141,4 +207,26 @@ async def check_database_health() -> dict:
             "status": "error",
             "connected": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+
+# Batched cursor reads with read-ahead (for exports and other multi-page scans)
+async def prefetch_batches(cursor, batch_size: int = 200):
+    """Yield a cursor's documents in lists of batch_size, fetching the next
+    batch while the caller works on the current one
+    
+    Not used by the current pages (they read at most one bounded page); it is
+    here for upcoming full-collection exports.
+    """
+    cursor.batch_size(batch_size)
+    pending = asyncio.ensure_future(cursor.to_list(length=batch_size))
+    try:
+        while pending is not None:
+            batch = await pending
+            # A short batch means the cursor is exhausted - no read-ahead needed
+            pending = asyncio.ensure_future(cursor.to_list(length=batch_size)) if len(batch) == batch_size else None
+            if batch:
+                yield batch
+    finally:
+        if pending is not None:
+            pending.cancel()
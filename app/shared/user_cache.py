@@ -0,0 +1,29 @@
+# app/shared/user_cache.py - IN-PROCESS USER DOCUMENT CACHES
+
+import logging
+from typing import Dict
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Every named cache holds user documents keyed by the user's own id, so a
+# profile write can drop that user from all of them in one call.
+_user_caches: Dict[str, TTLCache] = {}
+
+
+def get_user_cache(name: str, ttl: float = 60, maxsize: int = 10_000) -> TTLCache:
+    """Get (or create) a named per-user TTL cache. Keys must be user ids, never routes."""
+    cache = _user_caches.get(name)
+    if cache is None:
+        cache = _user_caches[name] = TTLCache(maxsize=maxsize, ttl=ttl)
+    return cache
+
+
+def invalidate_user_cache(user_id: str) -> None:
+    """Drop a user's cached document from every user cache after it changes"""
+    if not user_id:
+        return
+    for cache in _user_caches.values():
+        cache.pop(str(user_id), None)
+    logger.debug(f"🧹 User cache invalidated for {user_id}")
@@ -5,7 +5,9 @@ import hashlib
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 from fastapi import Request, HTTPException
+from fastapi.responses import Response
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -200,6 +202,16 @@ def hash_data(data: str) -> str:
     """Create hash of data for security/caching"""
     return hashlib.sha256(data.encode()).hexdigest()[:16]
 
+def revalidated_json(request: Request, payload: Dict[str, Any]) -> Response:
+    """JSON response the browser may keep but must revalidate (ETag) before reuse -
+    304 Not Modified when its copy is still current"""
+    body = orjson.dumps(payload)
+    etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+    headers = {"Cache-Control": "private, no-cache", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
 def validate_file_type(filename: str, allowed_extensions: list = None) -> bool:
     """Validate uploaded file type"""
     if allowed_extensions is None:
@@ -4,6 +4,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import uvicorn
+import logging
+import logging.handlers
+import queue
 import sys
 import os
 from bson import ObjectId
@@ -25,6 +28,17 @@ app = FastAPI(
 from dotenv import load_dotenv
 load_dotenv()
 
+# LOG_LEVEL=DEBUG brings back the per-request route traces; INFO skips them
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Records are queued and written to stderr by a listener thread, so a burst of
+# error logs never blocks the event loop on console I/O. force=True replaces any
+# handler a module installed at import time.
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(_log_queue)], force=True)
+_log_listener.start()
+logging.getLogger("app").setLevel(LOG_LEVEL)
+
 # Enable CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -176,6 +190,7 @@ async def startup_event():
             from app.shared.database import database
             await database.connect_to_database()
             print("✅ Database connection established")
+            await citizen_service.start_leaderboard_refresh()
         except Exception as db_error:
             print(f"⚠️ Database connection failed: {db_error}")
             print("🔧 Continuing in demo mode...")
@@ -194,12 +209,28 @@ async def startup_event():
 async def shutdown_event():
     """Close database connection"""
     try:
+        from app.citizen.services import citizen_service
         from app.shared.database import database
+        # Buffered points history goes out before the client closes
+        await citizen_service.stop_leaderboard_refresh()
+        await citizen_service.flush_points_transactions()
         await database.close_database_connection()
         print("✅ Database connection closed")
     except:
         print("✅ Shutdown complete")
+    finally:
+        # Write out whatever is still queued
+        _log_listener.stop()
 
 # Run the app
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # httptools parser + uvloop event loop (loop="auto" falls back to asyncio
+    # where uvloop isn't installed, e.g. Windows)
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        log_level=LOG_LEVEL.lower(),
+        loop="auto",
+        http="httptools"
+    )
\ No newline at end of file